@@ -0,0 +1,111 @@
+"""Over/under analysis for prop lines.
+
+A ThresholdIndex holds, for every numeric stat in a gamelog, the sorted
+values of all games and of each opponent / home-away bucket. Counting games
+over or under a line is then two binary searches, and a whole hit-rate curve
+across every half-point line is one vectorized searchsorted call.
+"""
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from metrics import span
+
+INDEX_CACHE_SIZE = 64
+
+_indexes = LRUCache('threshold_indexes', max_entries=INDEX_CACHE_SIZE)
+_opponent_games = LRUCache('opponent_games', max_entries=INDEX_CACHE_SIZE)
+
+
+class ThresholdIndex:
+    """Sorted per-stat values for one gamelog, bucketed by opponent and home/away"""
+
+    def __init__(self, game_log):
+        self.stats = list(game_log.select_dtypes(include='number').columns)
+        self._sorted = {}
+        opponents = game_log['Opp'] if 'Opp' in game_log.columns else None
+        home = game_log['Home'] if 'Home' in game_log.columns else None
+
+        # (opponent, home) -> row mask; None means "any"
+        masks = {(None, None): np.ones(len(game_log), dtype=bool)}
+        if opponents is not None:
+            for opp in opponents.dropna().unique():
+                masks[(opp, None)] = (opponents == opp).to_numpy()
+        if home is not None:
+            for is_home in (True, False):
+                # Neutral-site games (NA) are in neither bucket
+                masks[(None, is_home)] = home.eq(is_home).to_numpy(dtype=bool, na_value=False)
+            if opponents is not None:
+                for opp in opponents.dropna().unique():
+                    for is_home in (True, False):
+                        masks[(opp, is_home)] = masks[(opp, None)] & masks[(None, is_home)]
+
+        for stat in self.stats:
+            values = game_log[stat].to_numpy(dtype=np.float64)
+            for bucket, mask in masks.items():
+                bucket_values = values[mask]
+                self._sorted[(stat, bucket)] = np.sort(bucket_values[~np.isnan(bucket_values)])
+
+    def values(self, stat, opponent=None, home=None):
+        """Sorted non-missing values of stat in the bucket (empty if the bucket has no games)"""
+        return self._sorted.get((stat, (opponent, home)), np.empty(0))
+
+    def summary(self, stat, opponent=None, home=None):
+        """Mean, min, max and sample standard deviation of stat in the bucket"""
+        values = self.values(stat, opponent, home)
+        if len(values) == 0:
+            return {'count': 0, 'mean': np.nan, 'min': np.nan, 'max': np.nan, 'std': np.nan}
+        return {
+            'count': len(values),
+            'mean': values.mean(),
+            'min': values[0],
+            'max': values[-1],
+            'std': values.std(ddof=1) if len(values) > 1 else np.nan,
+        }
+
+    def counts(self, stat, threshold, opponent=None, home=None):
+        """Return (games over, games under) threshold; games equal to it count as neither"""
+        values = self.values(stat, opponent, home)
+        under = int(np.searchsorted(values, threshold, side='left'))
+        over = int(len(values) - np.searchsorted(values, threshold, side='right'))
+        return over, under
+
+    def hit_rate_curve(self, stat, opponent=None, home=None, lines=None):
+        """Over/under counts and percentages for every half-point line in the stat's range"""
+        values = self.values(stat, opponent, home)
+        if lines is None:
+            if len(values) == 0:
+                lines = np.empty(0)
+            else:
+                lines = np.arange(np.floor(values[0]) - 0.5, np.ceil(values[-1]) + 1.0, 1.0)
+        lines = np.asarray(lines, dtype=np.float64)
+        under = np.searchsorted(values, lines, side='left')
+        over = len(values) - np.searchsorted(values, lines, side='right')
+        decided = over + under
+        with np.errstate(invalid='ignore', divide='ignore'):
+            over_pct = np.where(decided > 0, over / decided * 100, 0.0)
+            under_pct = np.where(decided > 0, under / decided * 100, 0.0)
+        return pd.DataFrame({
+            'Line': lines,
+            'Over': over,
+            'Under': under,
+            'Over %': over_pct,
+            'Under %': under_pct,
+        })
+
+
+def threshold_index(key, game_log):
+    """Return the ThresholdIndex for game_log, building it once per key"""
+    def build():
+        with span('analysis.index'):
+            return ThresholdIndex(game_log)
+    return _indexes.get_or_build(key, build)
+
+
+def opponent_games(key, game_log, opponent):
+    """Rows of game_log against opponent, selected once per (key, opponent) and shared by every session.
+
+    The boolean selection is the one copy made; callers treat the result as
+    read-only and copy it before modifying it.
+    """
+    return _opponent_games.get_or_build((key, opponent), lambda: game_log[(game_log['Opp'] == opponent).to_numpy()])
@@ -0,0 +1,289 @@
+"""Local HTTP API over the engine, for services that need the app's data.
+
+    python cli.py serve --port 8765
+    BREF_API_PORT=8765 streamlit run bref.py   # same API inside the app process
+
+Endpoints (GET):
+
+    /teams?season=2025
+    /roster/BOS?season=2025
+    /gamelog/<player>?season=2025                    player id, URL or name
+    /hit-rates/<player>?stat=PTS&line=20.5           summary and over/under counts
+    /hit-rates/<player>?stat=PTS                     hit rate at every half-point line
+    /health
+
+hit-rates also accepts opponent=<abbr> and home=home|away. Tables are sent
+as compact JSON in pandas' "split" layout (columns, index and data arrays)
+or, with ?format=arrow or an Accept: application/vnd.apache.arrow.stream
+header, as an Arrow IPC stream; responses are gzipped when the client
+accepts it.
+
+The server is one asyncio loop; engine calls run on a thread pool. Identical
+requests in flight share one computation, and gamelog loads join the shared
+prefetch pool, so concurrent requests for a player make one upstream fetch.
+Inside the Streamlit process the API shares every in-memory cache with the
+UI; standalone it shares the on-disk HTTP cache and gamelog store.
+"""
+import asyncio
+import gzip
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import pandas as pd
+
+from engine import (
+    CURRENT_SEASON, gamelog_url, get_nba_teams, inc_metric, load_gamelog, load_roster, prefetch_gamelogs,
+    prop_summary, resolve_player_url, span, team_url, threshold_index,
+)
+
+API_WORKERS = 8
+KEEPALIVE_TIMEOUT = 15
+MAX_HEADER_LINES = 100
+GZIP_MIN_BYTES = 1024
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+JSON_TYPE = 'application/json'
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error',
+            502: 'Bad Gateway'}
+
+_server = None
+_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    """Error answered with status and a JSON {"error": message} body"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _season(params):
+    try:
+        return int(params.get('season', CURRENT_SEASON))
+    except ValueError:
+        raise ApiError(400, f"Invalid season: {params['season']}")
+
+
+def _player_gamelog(player, params):
+    """(gamelog URL, GamelogPage) for a player id, URL or name"""
+    season = _season(params)
+    player_url = resolve_player_url(player, season)
+    if player_url is None:
+        raise ApiError(404, f"Unknown player: {player}")
+    url = gamelog_url(player_url, season)
+    # Joins a load already running for this URL (from the UI or another request)
+    future = prefetch_gamelogs([url]).get(url)
+    page = future.result() if future is not None else load_gamelog(url)
+    if page.status_code != 200:
+        raise ApiError(404 if page.status_code == 404 else 502, f"Gamelog unavailable (HTTP {page.status_code})")
+    return url, page
+
+
+def teams(params):
+    return get_nba_teams(_season(params))
+
+
+def roster(team, params):
+    team_roster = load_roster(team_url(team.upper(), _season(params)))
+    if team_roster.roster is None:
+        raise ApiError(404 if team_roster.status_code in (200, 404) else 502, f"No roster for {team}")
+    return team_roster.roster
+
+
+def gamelog(player, params):
+    return _player_gamelog(player, params)[1].game_log
+
+
+def hit_rates(player, params):
+    stat = params.get('stat')
+    if not stat:
+        raise ApiError(400, "stat is required")
+    url, page = _player_gamelog(player, params)
+    game_log = page.game_log
+    if stat not in game_log.columns:
+        raise ApiError(400, f"Unknown stat: {stat}")
+    opponent = params.get('opponent') or None
+    home = {'home': True, 'away': False}.get(params.get('home', '').lower())
+    # Same key as the app's player view, so the UI and API share one index
+    key = (url, len(game_log))
+    if 'line' not in params:
+        return threshold_index(key, game_log).hit_rate_curve(stat, opponent, home)
+    try:
+        line = float(params['line'])
+    except ValueError:
+        raise ApiError(400, f"Invalid line: {params['line']}")
+    summary = prop_summary(game_log, stat, line, opponent, home, key=key)
+    return dict(summary, player=page.player_name, stat=stat, line=line, opponent=opponent, home=home)
+
+
+ROUTES = {
+    'teams': (teams, False),
+    'roster': (roster, True),
+    'gamelog': (gamelog, True),
+    'hit-rates': (hit_rates, True),
+}
+
+
+def _plain(value):
+    """JSON-safe scalar: numpy numbers to Python, NaN to null"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def encode(result, arrow=False):
+    """(content type, body bytes) for a DataFrame or dict result"""
+    if isinstance(result, pd.DataFrame):
+        if arrow:
+            import pyarrow as pa  # deferred: only Arrow clients need it
+
+            table = pa.Table.from_pandas(result, preserve_index=True)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return ARROW_TYPE, sink.getvalue().to_pybytes()
+        return JSON_TYPE, result.to_json(orient='split', date_format='iso').encode()
+    body = {key: _plain(value) for key, value in result.items()}
+    return JSON_TYPE, json.dumps(body, separators=(',', ':')).encode()
+
+
+def respond(route, arg, params, arrow=False, compress=False):
+    """Run one API call and encode it: (status, content type, body, gzipped)"""
+    try:
+        handler, takes_arg = ROUTES[route]
+        with span(f"api.{route}"):
+            result = handler(arg, params) if takes_arg else handler(params)
+        content_type, body = encode(result, arrow)
+        status = 200
+    except ApiError as e:
+        status, content_type, body = e.status, JSON_TYPE, json.dumps({'error': str(e)}).encode()
+    except Exception as e:
+        status, content_type, body = 500, JSON_TYPE, json.dumps({'error': str(e)}).encode()
+    if compress and len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=5)
+    return status, content_type, body, compress and body[:2] == b'\x1f\x8b'
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 server answering ROUTES; engine work runs on a thread pool"""
+
+    def __init__(self, host='127.0.0.1', port=8765, workers=API_WORKERS):
+        self.host = host
+        self.port = port
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bref-api')
+        self._in_flight = {}
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _call(self, key, *args):
+        """Result of respond(*args), shared by every identical request in flight"""
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, respond, *args)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            inc_metric("api_coalesced_total")
+        # shield: one client disconnecting must not cancel the others' result
+        return await asyncio.shield(future)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                headers = await self._read_headers(reader)
+                method, target, version = (request_line.decode('latin-1').split() + ['', '', ''])[:3]
+                connection = headers.get('connection', '').lower()
+                # HTTP/1.1 connections stay open unless the client closes them; 1.0 ones only on request
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                if method != 'GET':
+                    response = 405, JSON_TYPE, b'{"error":"only GET is supported"}', False
+                else:
+                    response = await self._route(target, headers)
+                await self._write(writer, *response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_headers(self, reader):
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return headers
+
+    async def _route(self, target, headers):
+        inc_metric("api_requests_total")
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/', 1)]
+        route, arg = parts[0], (parts[1] if len(parts) > 1 else None)
+        if route == 'health':
+            return 200, JSON_TYPE, b'{"status":"ok"}', False
+        if route not in ROUTES or ROUTES[route][1] != bool(arg):
+            return 404, JSON_TYPE, json.dumps({'error': f"No such endpoint: {url.path}"}).encode(), False
+        params = dict(parse_qsl(url.query))
+        arrow = params.pop('format', '') == 'arrow' or ARROW_TYPE in headers.get('accept', '')
+        compress = 'gzip' in headers.get('accept-encoding', '')
+        key = (route, arg, tuple(sorted(params.items())), arrow, compress)
+        return await self._call(key, route, arg, params, arrow, compress)
+
+    async def _write(self, writer, status, content_type, body, gzipped, keep_alive):
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if gzipped:
+            head.append("Content-Encoding: gzip")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+
+def serve(host='127.0.0.1', port=8765, workers=API_WORKERS):
+    """Run the API in the foreground until interrupted"""
+    asyncio.run(ApiServer(host, port, workers).serve_forever())
+
+
+def start_server(port, host='127.0.0.1'):
+    """Serve the API from a background thread; later calls return the running server"""
+    global _server
+    with _lock:
+        if _server is None:
+            server = ApiServer(host, port)
+            ready = threading.Event()
+
+            def run():
+                async def main():
+                    await server.start()
+                    ready.set()
+                    await server.serve_forever()
+                asyncio.run(main())
+
+            threading.Thread(target=run, name="bref-api", daemon=True).start()
+            ready.wait(timeout=5)
+            _server = server
+        return _server
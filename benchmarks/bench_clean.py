@@ -0,0 +1,107 @@
+"""Benchmark the schema-driven gamelog cleaner against the legacy string round-trip cleaner.
+
+Builds synthetic multi-season gamelogs shaped like bbref's pgl_basic table
+(string cells keyed by data-stat) and reports wall time, tracemalloc peak
+and resulting frame size for both cleaners.
+
+    python benchmarks/bench_clean.py [--seasons 1 5 20] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamelog import clean_gamelog  # noqa: E402
+
+STAT_LABELS = {
+    'ranker': 'Rk', 'game_season': 'G', 'date_game': 'Date', 'age': 'Age', 'team_id': 'Tm',
+    'game_location': 'Unnamed: 5', 'opp_id': 'Opp', 'game_result': 'Unnamed: 7', 'gs': 'GS',
+    'mp': 'MP', 'fg': 'FG', 'fga': 'FGA', 'fg_pct': 'FG%', 'fg3': '3P', 'fg3a': '3PA',
+    'fg3_pct': '3P%', 'ft': 'FT', 'fta': 'FTA', 'ft_pct': 'FT%', 'orb': 'ORB', 'drb': 'DRB',
+    'trb': 'TRB', 'ast': 'AST', 'stl': 'STL', 'blk': 'BLK', 'tov': 'TOV', 'pf': 'PF',
+    'pts': 'PTS', 'game_score': 'GmSc', 'plus_minus': '+/-',
+}
+OPPONENTS = ['ATL', 'BOS', 'BRK', 'CHI', 'CHO', 'CLE', 'DAL', 'DEN', 'DET', 'GSW', 'HOU', 'IND',
+             'LAC', 'LAL', 'MEM', 'MIA', 'MIL', 'MIN', 'NOP', 'NYK', 'OKC', 'ORL', 'PHI', 'PHO',
+             'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS']
+
+
+def synthetic_raw_gamelog(seasons, games_per_season=82, seed=0):
+    """String-celled gamelog keyed by data-stat, the shape table_to_frame(typed=False) returns"""
+    rng = random.Random(seed)
+    rows = []
+    start = pd.Timestamp('2000-10-25')
+    for season in range(seasons):
+        for game in range(games_per_season):
+            date = (start + pd.Timedelta(days=365 * season + 2 * game)).strftime('%Y-%m-%d')
+            row = {stat: '' for stat in STAT_LABELS}
+            row.update(ranker=str(game + 1), date_game=date, age='25-100', team_id='BOS',
+                       game_location=rng.choice(['', '@']), opp_id=rng.choice(OPPONENTS),
+                       game_result='W (+4)')
+            if game % 15 != 7:
+                fga = rng.randint(8, 28)
+                fg = rng.randint(2, fga)
+                row.update(game_season=str(game + 1), gs='1', mp=f"{rng.randint(20, 44)}:{rng.randint(0, 59):02d}",
+                           fg=str(fg), fga=str(fga), fg_pct=f"{fg / fga:.3f}"[1:], fg3='2', fg3a='6',
+                           fg3_pct='.333', ft='4', fta='5', ft_pct='.800', orb='1', drb='6', trb='7',
+                           ast=str(rng.randint(0, 12)), stl='1', blk='0', tov='2', pf='3',
+                           pts=str(2 * fg + 6), game_score='15.2', plus_minus='+5')
+            rows.append(row)
+    return pd.DataFrame(rows, dtype=object)
+
+
+def legacy_clean(game_log):
+    """The cleaning block the player_gamelog view used before the schema-driven cleaner"""
+    game_log = game_log.loc[:, ~game_log.columns.str.contains('Unnamed:', case=False)]
+    columns_to_exclude = ['GmSc', '+/-', 'Date', 'Tm', 'Age', 'Rk']
+    game_log = game_log.drop(columns=columns_to_exclude, errors='ignore')
+    columns_with_none = [
+        col for col in game_log.columns
+        if game_log[col].astype(str).str.lower().eq('None').any()
+    ]
+    if columns_with_none:
+        game_log = game_log.drop(columns=columns_with_none)
+    for col in game_log.columns:
+        if col in ["MP", "Opp"]:
+            continue
+        cleaned = game_log[col].astype(str).str.replace(',', '', regex=False).str.replace('%', '', regex=False)
+        game_log[col] = pd.to_numeric(cleaned, errors='coerce')
+    return game_log
+
+
+def measure(func, frame, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(frame)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = func(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'seasons':>7} {'rows':>6} {'cleaner':>8} {'time ms':>9} {'peak KiB':>9} {'result KiB':>10}")
+    for seasons in args.seasons:
+        raw = synthetic_raw_gamelog(seasons)
+        labelled = raw.rename(columns=STAT_LABELS)
+        for name, func, frame in (('legacy', legacy_clean, labelled), ('schema', clean_gamelog, raw)):
+            best, peak, size = measure(func, frame, args.repeat)
+            print(f"{seasons:>7} {len(raw):>6} {name:>8} {best * 1000:>9.2f} {peak / 1024:>9.0f} {size / 1024:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
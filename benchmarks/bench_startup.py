@@ -0,0 +1,120 @@
+"""Measure cold-start cost: module import time and first render of the Streamlit app.
+
+Each measurement runs in a fresh interpreter so nothing is already in
+sys.modules. First render uses Streamlit's AppTest harness to run bref.py
+headlessly against the replay server over the fixture corpus (BREF_UPSTREAM,
+as in run.py), with throwaway cache and store directories; the sidebar's
+standings fetch goes to the replay server on the first run and is served from
+the on-disk fetch cache after that. Each run then reruns once to show the
+per-interaction cost with the shared in-process caches populated.
+
+    python benchmarks/bench_startup.py [--repeat 5] [--latency 0.0] [--json results.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+sys.path.insert(0, HERE)
+
+from fixtures import ensure_corpus  # noqa: E402
+from replay import ReplayServer  # noqa: E402
+
+IMPORT_TARGETS = ['engine', 'streamlit', 'plotly.express', 'pyarrow.parquet']
+
+_IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+_RENDER_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120).run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+errors = [e.value for e in at.exception]
+print(first, rerun, int(bool(errors)))
+"""
+
+
+def _run(snippet, env=None):
+    output = subprocess.run(
+        [sys.executable, '-c', snippet], capture_output=True, text=True, check=True, cwd=ROOT,
+        env=dict(os.environ, **(env or {})),
+    ).stdout.split()
+    return [float(value) for value in output]
+
+
+def measure_imports(repeat):
+    results = {}
+    for module in IMPORT_TARGETS:
+        samples = [_run(_IMPORT_SNIPPET.format(root=ROOT, module=module))[0] for _ in range(repeat)]
+        results[module] = statistics.median(samples)
+    return results
+
+
+def measure_first_render(repeat, latency=0.0):
+    app = os.path.join(ROOT, 'bref.py')
+    firsts, reruns, failed = [], [], 0
+    scratch = tempfile.mkdtemp(prefix='bref-startup-')
+    try:
+        with ReplayServer(ensure_corpus(), latency=latency) as server:
+            env = {
+                'BREF_UPSTREAM': server.url,
+                'BREF_RATE_PER_SECOND': '1000',
+                'BREF_RATE_BURST': '1000',
+                'BREF_CACHE_PATH': os.path.join(scratch, 'http.sqlite'),
+                'BREF_STORE_PATH': os.path.join(scratch, 'store'),
+                'BREF_NAMES_PATH': os.path.join(scratch, 'players'),
+            }
+            for _ in range(repeat):
+                first, rerun, error = _run(_RENDER_SNIPPET.format(root=ROOT, app=app), env)
+                firsts.append(first)
+                reruns.append(rerun)
+                failed += int(error)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {'first_render': statistics.median(firsts), 'rerun': statistics.median(reruns), 'failed_runs': failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds the replay server waits per response")
+    parser.add_argument('--json', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    imports = measure_imports(args.repeat)
+    render = measure_first_render(args.repeat, args.latency)
+
+    print(f"{'import':<20} {'median ms':>10}")
+    for module, seconds in imports.items():
+        print(f"{module:<20} {seconds * 1000:>10.1f}")
+    print(f"\n{'render':<20} {'median ms':>10}")
+    print(f"{'first render':<20} {render['first_render'] * 1000:>10.1f}")
+    print(f"{'rerun':<20} {render['rerun'] * 1000:>10.1f}")
+    if render['failed_runs']:
+        print(f"\n{render['failed_runs']} run(s) raised inside the app (replay server or cache unavailable?)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'imports': imports, 'render': render}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""Fixture corpus of basketball-reference pages for offline benchmarks.
+
+Pages are stored under a directory that mirrors bbref URL paths
+(leagues/NBA_2025.html, teams/BOS/2025.html, players/t/tatumja01/gamelog/2024)
+so the replay server can serve them as-is.
+
+    python benchmarks/fixtures.py generate [--dest DIR]
+    python benchmarks/fixtures.py record URL_PATH [URL_PATH ...] [--dest DIR]
+    python benchmarks/fixtures.py verify [--dest DIR]
+    python benchmarks/fixtures.py pin [--dest DIR]
+
+"generate" writes a deterministic synthetic corpus shaped like real bbref
+markup (data-stat cells, repeated header rows, tables hidden in comments,
+large navigation chrome). "record" downloads real pages into the same
+layout; recorded files replace synthetic ones with the same path.
+
+The corpus itself is not committed; benchmarks/corpus.sha256 pins it instead
+(one sha256sum line per page). "verify" lists pages that differ from the pin,
+and "pin" rewrites it after the generator changes (bump CORPUS_VERSION too).
+Results carry the corpus digest, so runs on different machines can be
+checked to have measured the same pages.
+"""
+import argparse
+import datetime
+import hashlib
+import os
+import random
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, 'fixtures')
+MANIFEST_PATH = os.path.join(HERE, 'corpus.sha256')
+SEASON = 2025
+# Bump when generate_corpus changes so existing corpora are regenerated
+CORPUS_VERSION = "3"
+ORIGIN = "https://www.basketball-reference.com"
+
+TEAMS = [
+    ("Atlanta Hawks", "ATL"), ("Boston Celtics", "BOS"), ("Brooklyn Nets", "BRK"),
+    ("Charlotte Hornets", "CHO"), ("Chicago Bulls", "CHI"), ("Cleveland Cavaliers", "CLE"),
+    ("Dallas Mavericks", "DAL"), ("Denver Nuggets", "DEN"), ("Detroit Pistons", "DET"),
+    ("Golden State Warriors", "GSW"), ("Houston Rockets", "HOU"), ("Indiana Pacers", "IND"),
+    ("Los Angeles Clippers", "LAC"), ("Los Angeles Lakers", "LAL"), ("Memphis Grizzlies", "MEM"),
+    ("Miami Heat", "MIA"), ("Milwaukee Bucks", "MIL"), ("Minnesota Timberwolves", "MIN"),
+    ("New Orleans Pelicans", "NOP"), ("New York Knicks", "NYK"), ("Oklahoma City Thunder", "OKC"),
+    ("Orlando Magic", "ORL"), ("Philadelphia 76ers", "PHI"), ("Phoenix Suns", "PHO"),
+    ("Portland Trail Blazers", "POR"), ("Sacramento Kings", "SAC"), ("San Antonio Spurs", "SAS"),
+    ("Toronto Raptors", "TOR"), ("Utah Jazz", "UTA"), ("Washington Wizards", "WAS"),
+]
+FIRST_NAMES = ["Jayson", "Nikola", "Luka", "Jaren", "Kristaps", "Gary", "Derrick", "Dāvis",
+               "Bogdan", "Jusuf", "Tim", "Kelly", "Alperen", "Dennis", "Killian", "Vasilije"]
+LAST_NAMES = ["Tatum", "Jokić", "Dončić", "Jackson", "Porziņģis", "Trent", "Jones", "Bertāns",
+              "Bogdanović", "Nurkić", "Hardaway", "Oubre", "Şengün", "Schröder", "Hayes", "Micić"]
+SUFFIXES = ["", "", "", "", " Jr.", " III", " II", " Sr."]
+
+GAMELOG_STATS = [
+    ("gs", "GS"), ("mp", "MP"), ("fg", "FG"), ("fga", "FGA"), ("fg_pct", "FG%"), ("fg3", "3P"),
+    ("fg3a", "3PA"), ("fg3_pct", "3P%"), ("ft", "FT"), ("fta", "FTA"), ("ft_pct", "FT%"),
+    ("orb", "ORB"), ("drb", "DRB"), ("trb", "TRB"), ("ast", "AST"), ("stl", "STL"), ("blk", "BLK"),
+    ("tov", "TOV"), ("pf", "PF"), ("pts", "PTS"), ("game_score", "GmSc"), ("plus_minus", "+/-"),
+]
+TEAM_STATS = [
+    ("fg", "FG"), ("fga", "FGA"), ("fg3", "3P"), ("fg3a", "3PA"), ("ft", "FT"), ("fta", "FTA"),
+    ("orb", "ORB"), ("drb", "DRB"), ("trb", "TRB"), ("ast", "AST"), ("stl", "STL"), ("blk", "BLK"),
+    ("tov", "TOV"), ("pf", "PF"), ("pts", "PTS"),
+]
+# Per-game ranges for TEAM_STATS
+TEAM_STAT_RANGES = [(38, 44), (85, 92), (11, 16), (32, 40), (15, 20), (19, 25), (9, 12), (31, 36),
+                    (41, 47), (23, 29), (6, 9), (4, 6), (12, 15), (17, 21), (105, 122)]
+GAMELOG_PREFIX = [
+    ("ranker", "Rk"), ("game_season", "G"), ("date_game", "Date"), ("age", "Age"),
+    ("team_id", "Tm"), ("game_location", ""), ("opp_id", "Opp"), ("game_result", ""),
+]
+
+# Benchmark players whose gamelog pages come in several sizes
+SIZED_GAMELOGS = {
+    'small': ('b/benchsm01', 20, 0),
+    'medium': ('b/benchmd01', 82, 2),
+    'large': ('b/benchlg01', 82, 12),
+}
+# A long career for multi-season loading
+CAREER_PLAYER = ('b/benchcr01', range(SEASON - 9, SEASON + 1))
+
+
+def _page(title, body, chrome_links):
+    # bbref pages carry a lot of navigation markup around the tables
+    nav = "".join(f'<li><a href="/x/{i}.html">Link {i}</a></li>' for i in range(chrome_links))
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head>'
+            f'<body><div id="header"><ul>{nav}</ul></div>{body}<div id="footer"><ul>{nav}</ul></div></body></html>')
+
+
+def _table(table_id, columns, rows, commented=False):
+    head = "".join(f'<th data-stat="{stat}">{label}</th>' for stat, label in columns)
+    body = "".join(rows)
+    html = f'<table id="{table_id}"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+    if commented:
+        return f'<div id="all_{table_id}"><!--\n{html}\n--></div>'
+    return f'<div id="all_{table_id}">{html}</div>'
+
+
+def _filler_table(rng, table_id, rows=40, commented=True):
+    columns = [(f"c{i}", f"C{i}") for i in range(12)]
+    body = [
+        "<tr>" + "".join(f'<td data-stat="c{i}">{rng.randint(0, 999)}</td>' for i in range(12)) + "</tr>"
+        for _ in range(rows)
+    ]
+    return _table(table_id, columns, body, commented)
+
+
+def player_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{rng.choice(SUFFIXES)}"
+
+
+def player_id(name, number):
+    last = name.split()[1]
+    ascii_last = last.encode('ascii', 'ignore').decode('ascii').lower()[:5]
+    ascii_first = name.split()[0].encode('ascii', 'ignore').decode('ascii').lower()[:2]
+    return f"{ascii_last[0]}/{ascii_last}{ascii_first}{number:02d}"
+
+
+def standings_page():
+    columns = [("team_name", "Team"), ("wins", "W"), ("losses", "L")]
+    rows = [
+        f'<tr><th data-stat="team_name"><a href="/teams/{abbr}/{SEASON}.html">{name}</a></th>'
+        f'<td data-stat="wins">41</td><td data-stat="losses">41</td></tr>'
+        for name, abbr in TEAMS
+    ]
+    body = _table("confs_standings_E", columns, rows[:15]) + _table("confs_standings_W", columns, rows[15:])
+    return _page(f"{SEASON - 1}-{str(SEASON)[2:]} NBA Season Summary", body, 400)
+
+
+def team_and_opponent_table(rng, games=82):
+    """Stacked Team / Team/G / Lg Rank / Opponent / Opponent/G rows, as on bbref team pages"""
+    columns = [("player", "")] + [("g", "G")] + [(stat, label) for stat, label in TEAM_STATS]
+    rows = []
+    for side in ("Team", "Opponent"):
+        per_game = {stat: rng.uniform(low, high) for (stat, _), (low, high) in zip(TEAM_STATS, TEAM_STAT_RANGES)}
+        totals = {stat: round(value * games) for stat, value in per_game.items()}
+        lines = [(side, games, totals), (f"{side}/G", "", {stat: f"{t / games:.1f}" for stat, t in totals.items()}),
+                 ("Lg Rank", "", {stat: rng.randint(1, 30) for stat in totals})]
+        for label, g, values in lines:
+            cells = "".join(f'<td data-stat="{stat}">{values[stat]}</td>' for stat, _ in TEAM_STATS)
+            rows.append(f'<tr><th data-stat="player">{label}</th><td data-stat="g">{g}</td>{cells}</tr>')
+    return _table("team_and_opponent", columns, rows, commented=True)
+
+
+def roster_page(rng, team_name, players):
+    columns = [("number", "No."), ("player", "Player"), ("pos", "Pos"), ("height", "Ht"),
+               ("weight", "Wt"), ("birth_date", "Birth Date"), ("birth_country", ""),
+               ("years_experience", "Exp"), ("college", "College")]
+    rows = [
+        f'<tr><th data-stat="number">{i}</th><td data-stat="player"><a href="/players/{pid}.html">{name}</a></td>'
+        f'<td data-stat="pos">{rng.choice(["PG", "SG", "SF", "PF", "C"])}</td><td data-stat="height">6-{rng.randint(1, 11)}</td>'
+        f'<td data-stat="weight">{rng.randint(180, 260)}</td><td data-stat="birth_date">March 3, 1998</td>'
+        f'<td data-stat="birth_country"><span>us</span></td><td data-stat="years_experience">{rng.randint(0, 15)}</td>'
+        f'<td data-stat="college">Duke</td></tr>'
+        for i, (name, pid) in enumerate(players)
+    ]
+    opponent = team_and_opponent_table(rng)
+    extras = "".join(_filler_table(rng, f"extra_{k}") for k in range(6))
+    body = (f'<div id="meta"><div><h1><span>{SEASON - 1}-{str(SEASON)[2:]}</span> <span>{team_name}</span> '
+            f'<span>Roster and Stats</span></h1></div></div>' + _table("roster", columns, rows) + opponent + extras)
+    return _page(f"{SEASON - 1}-{str(SEASON)[2:]} {team_name} Roster and Stats", body, 400)
+
+
+def _gamelog_row(rng, index, game, date, opponent, location):
+    prefix = (f'<th data-stat="ranker">{index + 1}</th><td data-stat="game_season">{game or ""}</td>'
+              f'<td data-stat="date_game"><a href="/boxscores/x.html">{date.isoformat()}</a></td>'
+              f'<td data-stat="age">26-000</td><td data-stat="team_id">BOS</td>'
+              f'<td data-stat="game_location">{location}</td>'
+              f'<td data-stat="opp_id"><a href="/teams/{opponent}/{SEASON}.html">{opponent}</a></td>'
+              f'<td data-stat="game_result">W (+{rng.randint(1, 20)})</td>')
+    if game is None:
+        return f'<tr>{prefix}<td class="center" data-stat="reason" colspan="22">Inactive</td></tr>'
+    fga, fg3a, fta = rng.randint(8, 28), rng.randint(1, 12), rng.randint(0, 12)
+    fg, fg3, ft = rng.randint(2, fga), rng.randint(0, fg3a), rng.randint(0, fta)
+    orb, drb = rng.randint(0, 4), rng.randint(1, 11)
+    values = [1, f"{rng.randint(20, 44)}:{rng.randint(0, 59):02d}", fg, fga, f"{fg / fga:.3f}".lstrip("0"),
+              fg3, fg3a, f"{fg3 / fg3a:.3f}".lstrip("0"), ft, fta, f"{ft / fta:.3f}".lstrip("0") if fta else "",
+              orb, drb, orb + drb, rng.randint(0, 12), rng.randint(0, 3), rng.randint(0, 3), rng.randint(0, 5),
+              rng.randint(0, 6), 2 * fg + fg3 + ft, f"{rng.uniform(0, 40):.1f}", f"{rng.randint(-25, 25):+d}"]
+    cells = "".join(f'<td data-stat="{stat}">{value}</td>' for (stat, _), value in zip(GAMELOG_STATS, values))
+    return f'<tr>{prefix}{cells}</tr>'
+
+
+def gamelog_page(rng, name, season, games, extra_tables):
+    columns = GAMELOG_PREFIX + GAMELOG_STATS
+    header_row = '<tr class="thead">' + "".join(f'<th data-stat="{s}">{l}</th>' for s, l in columns) + '</tr>'
+    rows, game = [], 0
+    date = datetime.date(season - 1, 10, 22)
+    opponents = [abbr for _, abbr in TEAMS if abbr != "BOS"]
+    for i in range(games):
+        date += datetime.timedelta(days=rng.choice([1, 2, 2, 3]))
+        inactive = i % 17 == 9
+        if not inactive:
+            game += 1
+        rows.append(_gamelog_row(rng, i, None if inactive else game, date,
+                                 rng.choice(opponents), rng.choice(["", "@"])))
+        if i % 20 == 19:
+            rows.append(header_row)
+    extras = "".join(_filler_table(rng, f"extra_{k}", rows=80) for k in range(extra_tables))
+    label = f"{season - 1}-{str(season)[2:]}"
+    body = (f'<div class="breadcrumbs"><a href="/">BBR Home Page</a> <a href="/players/">Players</a></div>'
+            f'<div id="meta"><h1><span>{name} {label} Game Log</span></h1></div>'
+            + _filler_table(rng, "last5", rows=5, commented=False)
+            + _table("pgl_basic", columns, rows) + extras)
+    return _page(f"{name} {label} Game Log", body, 400)
+
+
+def player_page(rng, name, player_path, seasons):
+    columns = [("season", "Season"), ("g", "G"), ("pts_per_g", "PTS")]
+    rows = [
+        f'<tr><th data-stat="season"><a href="/players/{player_path}/gamelog/{season}">{season - 1}-{str(season)[2:]}</a></th>'
+        f'<td data-stat="g">{rng.randint(40, 82)}</td><td data-stat="pts_per_g">{rng.uniform(5, 30):.1f}</td></tr>'
+        for season in seasons
+    ]
+    body = f'<div id="meta"><h1><span>{name}</span></h1></div>' + _table("per_game", columns, rows)
+    return _page(f"{name} Stats", body, 400)
+
+
+def _write(dest, path, html):
+    full = os.path.join(dest, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def generate_corpus(dest=FIXTURES_DIR, seasons=(2024, 2025), seed=7):
+    """Write the synthetic corpus under dest and return {kind: [url paths]}"""
+    rng = random.Random(seed)
+    corpus = {'standings': [], 'roster': [], 'gamelog': []}
+
+    path = f"leagues/NBA_{SEASON}.html"
+    _write(dest, path, standings_page())
+    corpus['standings'].append(path)
+
+    for team_index, (team_name, abbr) in enumerate(TEAMS):
+        players, seen = [], set()
+        while len(players) < 15:
+            name = player_name(rng)
+            pid = player_id(name, team_index)
+            if pid not in seen:
+                seen.add(pid)
+                players.append((name, pid))
+        path = f"teams/{abbr}/{SEASON}.html"
+        _write(dest, path, roster_page(rng, team_name, players))
+        corpus['roster'].append(path)
+        # Full gamelogs for one team keep the corpus small but exercise roster-wide prefetch
+        if abbr == "BOS":
+            for name, pid in players:
+                _write(dest, f"players/{pid}.html", player_page(rng, name, pid, seasons))
+                for season in seasons:
+                    path = f"players/{pid}/gamelog/{season}"
+                    _write(dest, path, gamelog_page(rng, name, season, 82, 2))
+                    corpus['gamelog'].append(path)
+
+    for size, (pid, games, extra_tables) in SIZED_GAMELOGS.items():
+        path = f"players/{pid}/gamelog/{SEASON - 1}"
+        _write(dest, path, gamelog_page(rng, f"Bench {size.title()}", SEASON - 1, games, extra_tables))
+        corpus['gamelog'].append(path)
+
+    player_path, career = CAREER_PLAYER
+    _write(dest, f"players/{player_path}.html", player_page(rng, "Bench Career", player_path, career))
+    for season in career:
+        path = f"players/{player_path}/gamelog/{season}"
+        _write(dest, path, gamelog_page(rng, "Bench Career", season, 82, 2))
+        corpus['gamelog'].append(path)
+    return corpus
+
+
+def record(paths, dest=FIXTURES_DIR, delay=4.0):
+    """Download real bbref pages into dest, pausing between requests to stay under the rate limit"""
+    import requests
+
+    session = requests.Session()
+    session.headers["User-Agent"] = "Mozilla/5.0"
+    for i, path in enumerate(paths):
+        if i:
+            time.sleep(delay)
+        response = session.get(f"{ORIGIN}/{path.lstrip('/')}", timeout=30)
+        response.raise_for_status()
+        _write(dest, path.lstrip('/'), response.content.decode('utf-8'))
+        print(f"recorded {path} ({len(response.content)} bytes)")
+
+
+def ensure_corpus(dest=FIXTURES_DIR):
+    """Generate the synthetic corpus unless dest already has a current one"""
+    marker = os.path.join(dest, '.corpus-version')
+    if os.path.exists(marker):
+        with open(marker) as f:
+            if f.read().strip() == CORPUS_VERSION:
+                return dest
+    generate_corpus(dest)
+    with open(marker, 'w') as f:
+        f.write(CORPUS_VERSION)
+    return dest
+
+
+def corpus_manifest(dest=FIXTURES_DIR):
+    """sha256sum-style text listing every page under dest, sorted by path"""
+    lines = []
+    for directory, _, files in os.walk(dest):
+        for name in files:
+            if name.startswith('.'):
+                continue
+            full = os.path.join(directory, name)
+            with open(full, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            lines.append((os.path.relpath(full, dest).replace(os.sep, '/'), digest))
+    return "".join(f"{digest}  {path}\n" for path, digest in sorted(lines))
+
+
+def corpus_digest(dest=FIXTURES_DIR):
+    """One digest for the whole corpus under dest (the sha256 of its manifest)"""
+    return hashlib.sha256(corpus_manifest(dest).encode()).hexdigest()
+
+
+def pinned_digest():
+    """Digest of the pinned manifest, or None when there is none"""
+    if not os.path.exists(MANIFEST_PATH):
+        return None
+    with open(MANIFEST_PATH, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def verify_corpus(dest=FIXTURES_DIR):
+    """Paths whose pages are missing, extra or different from the pinned manifest"""
+    with open(MANIFEST_PATH) as f:
+        pinned = set(f.read().splitlines())
+    current = set(corpus_manifest(dest).splitlines())
+    return sorted({line.split('  ', 1)[1] for line in pinned ^ current})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    generate = subparsers.add_parser('generate', help="write the synthetic corpus")
+    generate.add_argument('--dest', default=FIXTURES_DIR)
+    recorder = subparsers.add_parser('record', help="download real pages by URL path")
+    recorder.add_argument('paths', nargs='+')
+    recorder.add_argument('--dest', default=FIXTURES_DIR)
+    for command, help in (('verify', "compare the corpus with the pinned manifest"),
+                          ('pin', "pin the current corpus in benchmarks/corpus.sha256")):
+        subparsers.add_parser(command, help=help).add_argument('--dest', default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        corpus = generate_corpus(args.dest)
+        print(f"wrote {sum(len(paths) for paths in corpus.values())} pages to {args.dest}")
+    elif args.command == 'record':
+        record(args.paths, args.dest)
+    elif args.command == 'verify':
+        differing = verify_corpus(ensure_corpus(args.dest))
+        for path in differing:
+            print(f"differs: {path}")
+        print(f"{len(differing)} page(s) differ from {MANIFEST_PATH}" if differing else "corpus matches the pin")
+        raise SystemExit(1 if differing else 0)
+    else:
+        with open(MANIFEST_PATH, 'w', newline='\n') as f:
+            f.write(corpus_manifest(ensure_corpus(args.dest)))
+        print(f"pinned {args.dest} in {MANIFEST_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Local stand-in for basketball-reference that replays the fixture corpus.
+
+Serves benchmarks/fixtures/ over HTTP with Last-Modified headers, so the
+fetch layer's conditional revalidation works as it does against bbref.
+Point the app at it with BREF_UPSTREAM:
+
+    python benchmarks/replay.py [--port 8765] [--latency 0.05]
+    BREF_UPSTREAM=http://127.0.0.1:8765 streamlit run bref.py
+"""
+import argparse
+import functools
+import http.server
+import threading
+import time
+
+from fixtures import FIXTURES_DIR, ensure_corpus
+
+
+class ReplayHandler(http.server.SimpleHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer:
+    """Threaded fixture server; use as a context manager to run it in the background"""
+
+    def __init__(self, root=FIXTURES_DIR, port=0, latency=0.0):
+        handler = type('Handler', (ReplayHandler,), {'latency': latency})
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', port), functools.partial(handler, directory=root)
+        )
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded bbref pages locally")
+    parser.add_argument('--root', default=FIXTURES_DIR)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds to delay each response")
+    args = parser.parse_args()
+
+    server = ReplayServer(ensure_corpus(args.root), args.port, args.latency)
+    print(f"Serving {args.root} at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
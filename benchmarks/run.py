@@ -0,0 +1,250 @@
+"""Offline benchmark suite: every stage of the app against replayed bbref pages.
+
+Starts the replay server over the fixture corpus, points the fetch layer at
+it (BREF_UPSTREAM) with throwaway cache and store directories, and measures
+per stage: best wall time over --repeat runs plus the tracemalloc peak of one
+extra run. Stages cover parsing and cleaning gamelog pages of several sizes,
+synthetic multi-season logs, trends and chart building, the standings, roster
+and league-wide defense loaders, roster name lookups, concurrent loads of one
+gamelog, multi-season career loads and end-to-end view latency (cold caches
+and warm caches).
+
+Results are written to benchmarks/results/<timestamp>-<commit>.json; pass
+--compare with an earlier result file to print the change per stage.
+benchmarks/reference.json is a committed run over the pinned corpus (see
+fixtures.py); every result records the corpus digest it measured.
+
+    python benchmarks/run.py [--repeat 5] [--latency 0.0] [--compare benchmarks/reference.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+RESULTS_DIR = os.path.join(HERE, 'results')
+SEASON = 2025
+SYNTHETIC_SEASONS = (1, 5, 20)
+CONCURRENT_SESSIONS = 8
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from fixtures import CAREER_PLAYER, SIZED_GAMELOGS, corpus_digest, ensure_corpus, pinned_digest  # noqa: E402
+from replay import ReplayServer  # noqa: E402
+
+
+def measure(func, repeat, setup=None):
+    """Best time over repeat runs and tracemalloc peak of one more; setup runs untimed before each"""
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=ROOT,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_stages(fixtures_dir, repeat):
+    # Imported here so BREF_* settings from main() are in place first
+    import cache
+    import fetch
+    import store
+    from bench_clean import synthetic_raw_gamelog
+    from engine import (
+        TrendState, find_player_url, get_nba_teams, league_defense, line_chart, load_career, load_gamelog, load_roster,
+        team_url,
+    )
+    from gamelog import GAMELOG_TABLE_IDS, clean_gamelog
+    from parse import parse_page, find_table, table_to_frame
+
+    def cold():
+        fetch.get_cache().clear()
+        cache.clear_all()
+        shutil.rmtree(store.STORE_ROOT, ignore_errors=True)
+
+    def warm_http():
+        cache.clear_all()
+
+    stages = {}
+    for size, (player_path, _, _) in SIZED_GAMELOGS.items():
+        path = os.path.join(fixtures_dir, 'players', player_path, 'gamelog', str(SEASON - 1))
+        with open(path, 'rb') as f:
+            content = f.read()
+        parse = lambda: table_to_frame(find_table(parse_page(content), *GAMELOG_TABLE_IDS), key='data-stat')  # noqa: E731
+        raw = parse()
+        stages[f'parse.gamelog.{size}'] = dict(measure(parse, repeat), rows=len(raw), page_bytes=len(content))
+        stages[f'clean.gamelog.{size}'] = dict(measure(lambda: clean_gamelog(raw), repeat), rows=len(raw))
+
+    for seasons in SYNTHETIC_SEASONS:
+        raw = synthetic_raw_gamelog(seasons)
+        stages[f'clean.synthetic.{seasons}y'] = dict(measure(lambda: clean_gamelog(raw), repeat), rows=len(raw))
+
+    # Trends for a long log from scratch vs. folding one new game into an existing state
+    game_log = clean_gamelog(synthetic_raw_gamelog(SYNTHETIC_SEASONS[-1]))
+    stages['trends.full'] = dict(measure(lambda: TrendState(game_log), repeat), rows=len(game_log))
+    states = []
+    stages['trends.extend'] = measure(
+        lambda: states[-1].extend(game_log), repeat, lambda: states.append(TrendState(game_log.iloc[:-1])),
+    )
+
+    # Figure for the long log built from scratch vs. served from the figure cache on a rerun
+    stages['chart.line.cold'] = dict(
+        measure(lambda: line_chart(game_log, 'PTS', 'PTS Over Time'), repeat, cache.clear_all), rows=len(game_log),
+    )
+    stages['chart.line.warm'] = measure(lambda: line_chart(game_log, 'PTS', 'PTS Over Time'), repeat)
+
+    stages['teams.cold'] = measure(lambda: get_nba_teams(SEASON), repeat, cold)
+    stages['teams.warm_http'] = measure(lambda: get_nba_teams(SEASON), repeat, warm_http)
+
+    url = team_url('BOS', SEASON)
+    stages['roster.cold'] = measure(lambda: load_roster(url), repeat, cold)
+    stages['roster.warm_http'] = measure(lambda: load_roster(url), repeat, warm_http)
+
+    stages['defense.cold'] = measure(lambda: league_defense(SEASON), repeat, cold)
+    stages['defense.warm_http'] = measure(lambda: league_defense(SEASON), repeat, warm_http)
+
+    player_links = load_roster(url).player_links
+    # Exact names hit the dict; casefolded ASCII spellings go through the name index
+    queries = list(player_links) + [name.encode('ascii', 'ignore').decode('ascii').lower() for name in player_links]
+    stages['find_player_url'] = dict(
+        measure(lambda: [find_player_url(name, player_links) for name in queries], repeat), lookups=len(queries),
+    )
+
+    career_url = f"https://www.basketball-reference.com/players/{CAREER_PLAYER[0]}.html"
+    # Sessions opening the same player at once share one fetch and parse
+    gamelog_page = f"https://www.basketball-reference.com/players/{CAREER_PLAYER[0]}/gamelog/{SEASON}"
+    with ThreadPoolExecutor(max_workers=CONCURRENT_SESSIONS) as pool:
+        stages['gamelog.concurrent.cold'] = dict(measure(
+            lambda: list(pool.map(lambda _: load_gamelog(gamelog_page), range(CONCURRENT_SESSIONS))), repeat, cold,
+        ), sessions=CONCURRENT_SESSIONS)
+
+    stages['career.cold'] = dict(measure(lambda: load_career(career_url), repeat, cold), seasons=len(CAREER_PLAYER[1]))
+    stages['career.warm_http'] = measure(lambda: load_career(career_url), repeat, warm_http)
+
+    stages.update(measure_views(url, player_links, repeat, cold))
+    return stages
+
+
+def measure_views(roster_url, player_links, repeat, cold):
+    """End-to-end rerun latency of each view through Streamlit's AppTest"""
+    from streamlit.testing.v1 import AppTest
+    from engine import gamelog_url
+
+    player_url = gamelog_url(next(iter(player_links.values())), SEASON)
+    views = {
+        'team_selection': {},
+        'team_roster': {'selected_team_url': roster_url},
+        'player_gamelog': {'selected_team_url': roster_url, 'selected_player_url': player_url},
+    }
+    results = {}
+    for view, state in views.items():
+        def render():
+            at = AppTest.from_file(os.path.join(ROOT, 'bref.py'), default_timeout=120)
+            at.session_state['current_view'] = view
+            for key, value in state.items():
+                at.session_state[key] = value
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"{view} raised: {at.exception[0].value}")
+        results[f'view.{view}.cold'] = measure(render, repeat, cold)
+        results[f'view.{view}.warm'] = measure(render, repeat)
+    return results
+
+
+def print_results(stages, baseline=None):
+    header = f"{'stage':<28} {'time ms':>9} {'peak KiB':>9}"
+    print(header + (f" {'Δ time':>8} {'Δ peak':>8}" if baseline else ""))
+    for name, result in stages.items():
+        line = f"{name:<28} {result['seconds'] * 1000:>9.2f} {result['peak_bytes'] / 1024:>9.0f}"
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += f" {(result['seconds'] / previous['seconds'] - 1) * 100:>+7.1f}%"
+            if previous['peak_bytes']:
+                line += f" {(result['peak_bytes'] / previous['peak_bytes'] - 1) * 100:>+7.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds the replay server waits per response")
+    parser.add_argument('--fixtures', default=None, help="fixture corpus directory (generated if missing)")
+    parser.add_argument('--compare', help="earlier result JSON to diff against")
+    parser.add_argument('--out', help="result JSON path (default benchmarks/results/<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    fixtures_dir = ensure_corpus(args.fixtures) if args.fixtures else ensure_corpus()
+    corpus = corpus_digest(fixtures_dir)
+    if corpus != pinned_digest():
+        print("note: the fixture corpus differs from benchmarks/corpus.sha256 "
+              "(python benchmarks/fixtures.py verify lists the pages)\n")
+    scratch = tempfile.mkdtemp(prefix='bref-bench-')
+    try:
+        with ReplayServer(fixtures_dir, latency=args.latency) as server:
+            os.environ.update(
+                BREF_UPSTREAM=server.url,
+                BREF_RATE_PER_SECOND='1000',
+                BREF_RATE_BURST='1000',
+                BREF_CACHE_PATH=os.path.join(scratch, 'http.sqlite'),
+                BREF_STORE_PATH=os.path.join(scratch, 'store'),
+                BREF_NAMES_PATH=os.path.join(scratch, 'players'),
+            )
+            stages = run_stages(fixtures_dir, args.repeat)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    revision = git_revision()
+    result = {
+        'revision': revision,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'latency': args.latency,
+        'corpus': corpus,
+        'stages': stages,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        baseline = previous['stages']
+        if previous.get('corpus') != corpus:
+            print(f"note: {args.compare} was measured on a different fixture corpus\n")
+    print_results(stages, baseline)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{revision}.json")
+    with open(out, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nwrote {out}")
+
+
+if __name__ == '__main__':
+    main()
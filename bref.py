@@ -1,33 +1,13 @@
-import streamlit as st
-import pandas as pd
-import requests
-import plotly.express as px
-from bs4 import BeautifulSoup
-import re
-import matplotlib.pyplot as plt
-import seaborn as sns
-import unicodedata
+import os
 
-# Define the function to get NBA teams
-def get_nba_teams():
-    """Retrieve current NBA teams from Basketball-Reference"""
-    url = "https://www.basketball-reference.com/leagues/NBA_2025.html"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    teams = []
-    # Find all team links in the standings tables
-    team_links = soup.select('table a[href*="/teams/"]')
-    
-    for link in team_links:
-        team_name = link.text
-        team_abbr = link['href'].split('/')[2]
-        if [team_name, team_abbr] not in teams:
-            teams.append([team_name, team_abbr])
-    
-    # Remove duplicates and return as DataFrame
-    teams_df = pd.DataFrame(teams, columns=['Team', 'Abbreviation']).drop_duplicates()
-    return teams_df
+import streamlit as st
+from engine import (
+    CAREER_TIMEOUT, CURRENT_SEASON, DEFAULT_LAST_N, bar_chart, cache_stats, finish_trace, gamelog_url,
+    get_nba_teams, inc_metric, iter_career, league_defense, line_chart, load_gamelog, load_roster,
+    memory_budget, memory_cache_bytes, memory_cache_stats, metrics_snapshot, opponent_adjusted, opponent_games,
+    player_id_from_url, prefetch_gamelogs, prometheus_text, screen_props, season_from_url, season_summary, span,
+    start_metrics_server, start_trace, team_url, threshold_index, trends, with_season,
+)
 
 st.set_page_config(
     page_title="Basketball Analyzer",
@@ -35,6 +15,16 @@ st.set_page_config(
     layout="wide"
 )
 
+# Collect the timed stages of this script run for the performance panel
+run_trace = start_trace()
+inc_metric("app_reruns_total")
+if os.environ.get("BREF_METRICS_PORT"):
+    start_metrics_server(int(os.environ["BREF_METRICS_PORT"]))
+if os.environ.get("BREF_API_PORT"):
+    # Runs in this process, so API clients share the app's in-memory caches
+    from api import start_server as start_api_server
+    start_api_server(int(os.environ["BREF_API_PORT"]))
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -100,6 +90,7 @@ if 'selected_player_url' not in st.session_state:
     st.session_state.selected_player_url = None
 if 'hide_sidebar' not in st.session_state:
     st.session_state.hide_sidebar = False
+st.session_state.rerun_count = st.session_state.get('rerun_count', 0) + 1
 
 # Sidebar for team selection
 with st.sidebar:
@@ -109,11 +100,14 @@ with st.sidebar:
         teams_df = get_nba_teams()
         selected_team = st.selectbox("Select NBA Team:", teams_df['Team'].tolist())
         team_abbr = teams_df[teams_df['Team'] == selected_team]['Abbreviation'].values[0]
-        team_url = f"https://www.basketball-reference.com/teams/{team_abbr}/2025.html"
         
         if st.button("View Team"):
             st.session_state.current_view = 'team_roster'
-            st.session_state.selected_team_url = team_url
+            st.session_state.selected_team_url = team_url(team_abbr)
+            st.rerun()
+            
+        if st.button("Prop Screener"):
+            st.session_state.current_view = 'prop_screen'
             st.rerun()
             
         # Hide sidebar option
@@ -123,6 +117,14 @@ with st.sidebar:
     except Exception as e:
         st.error(f"Error loading teams: {e}")
 
+    # Fetch cache statistics
+    stats = cache_stats()
+    st.caption(
+        f"Cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+        f"{stats['misses']} misses ({stats['hit_ratio']:.0%} hit ratio)"
+    )
+    st.checkbox("Show performance panel", key="debug_panel")
+
 # Hide sidebar if button was clicked
 if st.session_state.hide_sidebar:
     st.markdown(
@@ -145,90 +147,48 @@ if st.session_state.hide_sidebar:
 if st.session_state.current_view == 'team_selection':
     st.info("Please select a team from the sidebar to view their roster.")
 
+elif st.session_state.current_view == 'prop_screen':
+    # Screen a whole slate of prop lines at once
+    st.markdown("## Prop Screener")
+    st.write("Upload a CSV with `player`, `stat` and `line` columns (optionally `opponent`). "
+             "Players can be names, bbref ids like `tatumja01` or player URLs.")
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        slate_file = st.file_uploader("Slate CSV", type=["csv"], key="slate_file")
+        screen_season = st.selectbox("Season:", list(range(CURRENT_SEASON, CURRENT_SEASON - 10, -1)), key="screen_season")
+    with col2:
+        last_n = st.number_input("Last N games", min_value=1, max_value=82, value=DEFAULT_LAST_N, step=1)
+    
+    if slate_file is not None and st.button("Run Screen"):
+        try:
+            progress = st.progress(0.0, text="Loading game logs...")
+            results = screen_props(
+                slate_file, season=screen_season, last_n=int(last_n),
+                on_progress=lambda done, total: progress.progress(done / total, text=f"Loaded {done}/{total} game logs"),
+            )
+            progress.empty()
+            st.dataframe(results, use_container_width=True)
+            st.download_button("Download results", results.to_csv(index=False), "prop_screen.csv", "text/csv")
+        except Exception as e:
+            st.error(f"An error occurred screening props: {e}")
+
 elif st.session_state.current_view == 'team_roster':
     # Display team roster
     try:
         url = st.session_state.selected_team_url
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(url, headers=headers)
+        team = load_roster(url)
         
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Improved team name extraction with multiple fallback options
-            team_name = "NBA Team"  # Default fallback
-            
-            # Try different selectors to find team name
-            selectors = [
-                'h1[itemprop="name"] span',
-                'h1[data-testid="entity-name"]',
-                'h1.teamname',
-                'h1',
-                'div#meta div h1'
-            ]
-            
-            for selector in selectors:
-                element = soup.select_one(selector)
-                if element:
-                    # Clean up the text to get just the team name
-                    full_text = element.text.strip()
-                    # Remove year information if present
-                    team_name = re.sub(r'\s+\d{4}-\d{2,4}.*$', '', full_text)
-                    break
-            
-            # If still not found, try to extract from title
-            if team_name == "NBA Team" and soup.title:
-                title_text = soup.title.text
-                # Extract team name from title (usually in format "Team Name Roster...")
-                title_match = re.search(r'^(.*?)\s+Roster', title_text)
-                if title_match:
-                    team_name = title_match.group(1).strip()
-            
-            st.markdown(f"## {team_name} Roster")
+        if team.status_code == 200:
+            st.markdown(f"## {team.team_name} Roster")
             
-            # Extract roster table
-            tables = pd.read_html(response.text)
-            roster_table = None
-            
-            # Find the roster table (usually has 'Player' column)
-            for table in tables:
-                if 'Player' in table.columns:
-                    roster_table = table
-                    break
-            
-            if roster_table is not None:
-                # Add player URLs to the roster table
-                player_links = {}
-                for link in soup.select('table#roster a[href*="/players/"]'):
-                    # Get player name directly from the HTML
-                    player_name = link.text
-                    player_url = "https://www.basketball-reference.com" + link['href']
-                    player_links[player_name] = player_url
-                
-                # Create a new column for player URLs
-                if player_links and 'Player' in roster_table.columns:
-                    # Create a mapping function that tries different ways to match names
-                    def find_player_url(player_name):
-                        # Try direct match
-                        if player_name in player_links:
-                            return player_links[player_name]
-                        
-                        # Try normalized version (remove accents, etc.)
-                        normalized_player_name = unicodedata.normalize('NFKD', player_name).encode('ASCII', 'ignore').decode('ASCII')
-                        
-                        # Find closest match
-                        for name in player_links:
-                            normalized_name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('ASCII')
-                            if normalized_name == normalized_player_name:
-                                return player_links[name]
-                        
-                        return "N/A"
-                    
-                    # Apply the mapping function
-                    roster_table['Profile URL'] = roster_table['Player'].apply(find_player_url)
+            if team.roster is not None:
+                roster_table = team.roster
+                player_links = team.player_links
                 
                 # Display roster with URLs
-                st.dataframe(roster_table, use_container_width=True)
+                with span("render.roster_table"):
+                    st.dataframe(roster_table, use_container_width=True)
                 
                 # Allow selecting a player from roster
                 st.subheader("Select Player for Game Log")
@@ -239,20 +199,46 @@ elif st.session_state.current_view == 'team_roster':
                     player_url = player_links[selected_player]
                     
                     # Add year selection for game logs
-                    current_year = 2025  # Default to current season
+                    current_year = CURRENT_SEASON  # Default to current season
                     available_years = list(range(current_year, current_year-10, -1))  # Last 10 years
                     selected_year = st.selectbox("Select Season:", available_years)
                     
                     if st.button("View Player Game Log"):
                         # Modify URL to point to game log with selected year
-                        gamelog_url = player_url.replace(".html", f"/gamelog/{selected_year}")
-                        st.session_state.selected_player_url = gamelog_url
+                        st.session_state.selected_player_url = gamelog_url(player_url, selected_year)
                         st.session_state.current_view = 'player_gamelog'
                         st.rerun()
+                    
+                    # Optionally load every rostered player's game log in the background
+                    if st.checkbox("Prefetch game logs for the whole roster", key="prefetch_roster"):
+                        roster_urls = tuple(gamelog_url(u, selected_year) for u in player_links.values())
+                        # Submitted once per roster and season; the pool keeps loading across reruns
+                        if st.session_state.get('prefetch_urls') != roster_urls:
+                            st.session_state.prefetch_urls = roster_urls
+                            st.session_state.prefetch_futures = prefetch_gamelogs(roster_urls)
+                        futures = st.session_state.prefetch_futures
+                        loading = any(not future.done() for future in futures.values())
+
+                        # Only the progress line refreshes while loading; the page stays usable
+                        @st.fragment(run_every=1.0 if loading else None)
+                        def prefetch_progress():
+                            done = sum(future.done() for future in futures.values()) + len(roster_urls) - len(futures)
+                            failed = sum(future.done() and future.exception() is not None for future in futures.values())
+                            if done < len(roster_urls):
+                                st.progress(done / len(roster_urls), text=f"Prefetched {done}/{len(roster_urls)} game logs")
+                            elif loading:
+                                # Rerun the page once so the refresh timer stops
+                                st.rerun()
+                            else:
+                                st.caption(f"All {len(roster_urls)} game logs for {selected_year} are loaded.")
+                                if failed:
+                                    st.warning(f"{failed} game logs could not be prefetched.")
+
+                        prefetch_progress()
             else:
                 st.error("Could not find roster table on the team page.")
         else:
-            st.error(f"Failed to retrieve team data. HTTP Status Code: {response.status_code}")
+            st.error(f"Failed to retrieve team data. HTTP Status Code: {team.status_code}")
     except Exception as e:
         st.error(f"An error occurred loading team roster: {e}")
 
@@ -260,21 +246,12 @@ elif st.session_state.current_view == 'player_gamelog':
     # Display player game log
     try:
         url = st.session_state.selected_player_url
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(url, headers=headers)
+        # Parsed game logs are shared in memory, so prefetched players load instantly
+        page = load_gamelog(url)
         
-        if response.status_code == 200:
-            # Parse the HTML content to create the soup object
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+        if page.status_code == 200:
             # Extract player ID from URL for headshot image
-            player_id = None
-            if "/players/" in url:
-                url_parts = url.split("/players/")
-                if len(url_parts) > 1:
-                    player_path = url_parts[1].split("/")
-                    if len(player_path) > 1:
-                        player_id = player_path[1]
+            player_id = player_id_from_url(url)
             
             # Add "Back to Team Roster" button
             if st.button("← Back to Team Roster"):
@@ -282,11 +259,7 @@ elif st.session_state.current_view == 'player_gamelog':
                 st.rerun()
             
             # Extract current season from URL
-            current_season = "2025"  # Default
-            if "/gamelog/" in url:
-                url_parts = url.split("/gamelog/")
-                if len(url_parts) > 1 and url_parts[1].isdigit():
-                    current_season = url_parts[1]
+            current_season = str(season_from_url(url) or CURRENT_SEASON)
             
             # Season selector
             available_seasons = list(range(int(current_season), int(current_season)-10, -1))  # Last 10 years
@@ -297,40 +270,30 @@ elif st.session_state.current_view == 'player_gamelog':
             if selected_season != int(current_season):
                 if st.button(f"View {selected_season} Season"):
                     # Create new URL with selected season
-                    base_url = url.split("/gamelog/")[0] if "/gamelog/" in url else url.split("/")[:-1]
-                    if isinstance(base_url, list):
-                        base_url = "/".join(base_url)
-                    new_url = f"{base_url}/gamelog/{selected_season}"
-                    st.session_state.selected_player_url = new_url
+                    st.session_state.selected_player_url = with_season(url, selected_season)
                     st.rerun()
             
-            # Load tables
-            tables = pd.read_html(response.text)
-            
-            # Game log table (usually table 7)
-            game_log = tables[7]
-            
-            # Remove unnamed columns and drop specific ones if they exist
-            game_log = game_log.loc[:, ~game_log.columns.str.contains('Unnamed:', case=False)]
-            columns_to_exclude = ['GmSc', '+/-', 'Date', 'Tm', 'Age', 'Rk']
-            game_log = game_log.drop(columns=columns_to_exclude, errors='ignore')
+            game_log = page.game_log
+            log_key = url
             
-            # Identify and drop columns that contain the string "none" (case-insensitive)
-            columns_with_none = [
-                col for col in game_log.columns 
-                if game_log[col].astype(str).str.lower().eq('None').any()
-            ]
-            if columns_with_none:
-                game_log = game_log.drop(columns=columns_with_none)
-            
-            # Convert columns to numeric if possible, but skip columns 'MP' and 'Opp'
-            for col in game_log.columns:
-                if col in ["MP", "Opp"]:
-                    continue  # Do not convert these columns
-                # Clean values: remove commas and percentage signs
-                cleaned = game_log[col].astype(str).str.replace(',', '', regex=False).str.replace('%', '', regex=False)
-                # Convert to numeric; non-convertible values will become NaN
-                game_log[col] = pd.to_numeric(cleaned, errors='coerce')
+            # Career mode: every season is fetched in parallel and streamed in as it arrives
+            career_mode = st.checkbox("Career mode (all seasons)", key="career_mode")
+            if career_mode:
+                progress = st.progress(0.0, text="Loading career...")
+                season_table = st.empty()
+                career, pending = None, []
+                for done, total, career, pending in iter_career(url, timeout=CAREER_TIMEOUT):
+                    progress.progress(done / total if total else 1.0, text=f"Loaded {done}/{total} seasons")
+                    if not career.empty:
+                        season_table.dataframe(season_summary(career), hide_index=True, use_container_width=True)
+                progress.empty()
+                if pending:
+                    st.info(f"Still loading {', '.join(str(s) for s in pending)}; showing the seasons loaded so far.")
+                    if st.button("Include newly loaded seasons"):
+                        st.rerun()
+                if career is not None and not career.empty:
+                    game_log = career
+                    log_key = f"{url}#career"
             
             # Add opponent filter in sidebar
             with st.sidebar:
@@ -338,46 +301,16 @@ elif st.session_state.current_view == 'player_gamelog':
                     opponents = ['All'] + sorted(game_log['Opp'].unique().tolist())
                     selected_opponent = st.selectbox("Select Opponent:", opponents)
             
-            # Apply opponent filter if selected
+            # Apply opponent filter if selected; the filtered rows are shared by every session on this log
             filtered_game_log = game_log
             if 'Opp' in game_log.columns and selected_opponent != 'All':
-                filtered_game_log = game_log[game_log['Opp'] == selected_opponent]
+                filtered_game_log = opponent_games((log_key, len(game_log)), game_log, selected_opponent)
             
             # Display player card with headshot if player_id is available
             if player_id:
                 image_url = f"https://www.basketball-reference.com/req/202106291/images/headshots/{player_id}.jpg"
                 
-                # Try to get player name from the HTML content
-                player_name = "Player"
-                try:
-                    # Try multiple selectors to find player name
-                    player_name_element = soup.select_one('h1[itemprop="name"] span')
-                    if player_name_element:
-                        player_name = player_name_element.text
-                    else:
-                        # Alternative selector for player name
-                        player_name_element = soup.select_one('h1')
-                        if player_name_element:
-                            # Clean up the text to get just the player name
-                            full_text = player_name_element.text.strip()
-                            # Remove "Game Log" and year information if present
-                            player_name = re.sub(r'\s+Game Log.*$', '', full_text)
-                        else:
-                            # Try to extract from breadcrumbs
-                            breadcrumb = soup.select_one('div.breadcrumbs')
-                            if breadcrumb and breadcrumb.find_all('a'):
-                                # Usually the last breadcrumb link is the player name
-                                player_links = breadcrumb.find_all('a')
-                                if len(player_links) > 0:
-                                    player_name = player_links[-1].text
-                except Exception as e:
-                    st.warning(f"Could not extract player name: {e}")
-                    # Fallback to extracting from URL if HTML parsing fails
-                    if player_id:
-                        # Convert player_id format (like "jamesle01") to a readable name
-                        name_parts = re.findall(r'([a-z]+)([0-9]+)', player_id)
-                        if name_parts:
-                            player_name = name_parts[0][0].capitalize()
+                player_name = page.player_name
                 
                 if "gamelog" in url:
                     season = url.split("/")[-1] if url.split("/")[-1].isdigit() else "Current Season"
@@ -389,6 +322,9 @@ elif st.session_state.current_view == 'player_gamelog':
                     st.image(image_url, width=150)
                 with col2:
                     st.markdown(f"### {player_name}")
+                    if career_mode and 'Season' in game_log.columns:
+                        seasons_loaded = game_log['Season'].unique()
+                        season = f"Career ({min(seasons_loaded)}–{max(seasons_loaded)})"
                     st.markdown(f"**Season**: {season}")
                     if 'Opp' in game_log.columns and selected_opponent != 'All':
                         st.markdown(f"**Filtered by opponent**: {selected_opponent}")
@@ -403,7 +339,7 @@ elif st.session_state.current_view == 'player_gamelog':
                         avg_trb = filtered_game_log['TRB'].mean()
                         st.markdown(f"**Avg Assists**: {avg_ast:.1f} | **Avg Rebounds**: {avg_trb:.1f}")
             
-            tab1, tab2, tab3 = st.tabs(["Analysis", "Game Log", "Visualization"])
+            tab1, tab2, tab3, tab4 = st.tabs(["Analysis", "Trends", "Game Log", "Visualization"])
 
             with tab1:
                 st.subheader("Analysis Section")
@@ -418,7 +354,7 @@ elif st.session_state.current_view == 'player_gamelog':
                 
                 with col2:
                     # Dropdown for statistical analysis on numeric columns
-                    numeric_columns = filtered_game_log.select_dtypes(include=['float64', 'int64']).columns
+                    numeric_columns = filtered_game_log.select_dtypes(include='number').columns
                     stat_column = st.selectbox("Select a column for statistical analysis:", numeric_columns, key="stat_column", index=numeric_columns.get_loc('PTS') if 'PTS' in numeric_columns else 0)
                 
                 # Remove the selected columns from the DataFrame
@@ -427,17 +363,38 @@ elif st.session_state.current_view == 'player_gamelog':
                 # Calculate and display statistics for the chosen column
                 if stat_column:
                     try:
-                        stats = modified_game_log[stat_column].describe()
+                        # Sorted per-stat values, built once per game log and reused on every rerun
+                        index = threshold_index((log_key, len(game_log)), game_log)
+                        opponent_bucket = selected_opponent if 'Opp' in game_log.columns and selected_opponent != 'All' else None
+                        location = st.radio("Location:", ["All", "Home", "Away"], horizontal=True, key="location_filter")
+                        home_bucket = {"All": None, "Home": True, "Away": False}[location]
+                        
+                        stats = index.summary(stat_column, opponent_bucket, home_bucket)
                         st.subheader(f"Statistical Analysis for {stat_column}")
                         st.text(f"Average: {stats['mean']:.2f}")
                         st.text(f"Minimum: {stats['min']:.2f}")
                         st.text(f"Maximum: {stats['max']:.2f}")
                         st.text(f"Standard Deviation: {stats['std']:.2f}")
 
+                        # League-wide defense table, fetched once per season and joined on Opp in memory
+                        if 'Opp' in game_log.columns and not career_mode and st.checkbox(
+                                "Adjust for opponent defense", key="opponent_adjust"):
+                            defense_season = season_from_url(url) or CURRENT_SEASON
+                            defense = league_defense(defense_season)
+                            if stat_column in defense.columns:
+                                adjusted = opponent_adjusted(filtered_game_log, defense_season, [stat_column])
+                                st.text(f"Opponent-adjusted average: {adjusted[stat_column].mean():.2f}")
+                                if opponent_bucket in defense.index:
+                                    allowed = defense[stat_column]
+                                    rank = int(allowed.rank(ascending=False)[opponent_bucket])
+                                    st.text(f"{opponent_bucket} allows {allowed[opponent_bucket]:.1f} {stat_column} "
+                                            f"per game (#{rank} most of {len(allowed)})")
+                            else:
+                                st.caption(f"No opponent defense data for {stat_column}.")
+
                         # Allow the user to enter a threshold value
                         threshold = st.number_input("Enter threshold value", value=20.5, step=0.5)
-                        count_over = (modified_game_log[stat_column] > threshold).sum()
-                        count_under = (modified_game_log[stat_column] < threshold).sum()
+                        count_over, count_under = index.counts(stat_column, threshold, opponent_bucket, home_bucket)
                         total_matches = count_over + count_under
                         
                         # Calculate percentages
@@ -447,26 +404,63 @@ elif st.session_state.current_view == 'player_gamelog':
                         st.subheader("Stats Comparison")
                         st.write(f"Number of matches with {stat_column} over {threshold}: {count_over} ({pct_over:.1f}%)")
                         st.write(f"Number of matches with {stat_column} under {threshold}: {count_under} ({pct_under:.1f}%)")
+                        
+                        # Hit rate across every half-point line in one call
+                        curve = index.hit_rate_curve(stat_column, opponent_bucket, home_bucket)
+                        if not curve.empty:
+                            with span("render.hit_rate_chart"):
+                                fig = line_chart(curve, ['Over %', 'Under %'], f"{stat_column} Hit Rate by Line",
+                                                 x='Line', height=350, markers=True, yaxis_title="% of games",
+                                                 vline=threshold)
+                                st.plotly_chart(fig, use_container_width=True, key=f"hit_rate_curve_{stat_column}")
                     
                     except Exception as e:
                         st.error(f"Could not calculate statistics for {stat_column}: {e}")
 
             with tab2:
+                st.subheader("Trends")
+                try:
+                    # Cached per game log and extended in place when new games are appended
+                    trend_state = trends(log_key, game_log)
+                    st.caption("Per-game averages over games played. L5/L10/L20 are rolling averages and EWM an "
+                               "exponentially weighted mean; splits use every game, ignoring the opponent filter.")
+                    st.dataframe(trend_state.summary(), use_container_width=True)
+
+                    trend_stat = stat_column if stat_column in trend_state.stats else trend_state.stats[0]
+                    trend_columns = [col for col in trend_state.rolling.columns if col.startswith(f"{trend_stat} ")]
+                    if not trend_state.rolling.empty:
+                        with span("render.trend_chart"):
+                            fig = line_chart(trend_state.rolling, trend_columns, f"{trend_stat} Rolling Averages",
+                                             yaxis_title=trend_stat)
+                            st.plotly_chart(fig, use_container_width=True, key=f"trend_chart_{trend_stat}")
+                except Exception as e:
+                    st.error(f"Could not calculate trends: {e}")
+
+            with tab3:
                 st.subheader("Game Log")
                 # Display the filtered game log DataFrame
                 if not filtered_game_log.empty:
-                    st.dataframe(filtered_game_log, use_container_width=True)
+                    with span("render.gamelog_table"):
+                        st.dataframe(filtered_game_log, use_container_width=True)
                 else:
                     st.warning("No game log data available.")
 
-            with tab3:
+            with tab4:
                 st.subheader("Visualization Section")
                 # Line chart for selected stat over time
                 if stat_column:
-                    fig = px.line(modified_game_log, x=modified_game_log.index, y=stat_column, 
-                                 title=f"{stat_column} Over Time")
-                    fig.update_layout(height=400)
-                    st.plotly_chart(fig, use_container_width=True, key=f"line_chart_viz_{stat_column}")
+                    with span("render.line_chart"):
+                        # WebGL traces, downsampled past a point budget and cached across reruns
+                        fig = line_chart(modified_game_log, stat_column, f"{stat_column} Over Time")
+                        st.plotly_chart(fig, use_container_width=True, key=f"line_chart_viz_{stat_column}")
+
+                # Per-season averages when the whole career is loaded
+                if stat_column and 'Season' in modified_game_log.columns:
+                    with span("render.season_chart"):
+                        by_season = modified_game_log.groupby('Season', observed=True)[stat_column].mean().reset_index()
+                        fig = bar_chart(by_season, 'Season', stat_column, f"Average {stat_column} by Season",
+                                        height=350, categorical=True)
+                        st.plotly_chart(fig, use_container_width=True, key=f"season_chart_{stat_column}")
 
                 # Bar chart comparing multiple stats
                 stats_to_compare = st.multiselect(
@@ -477,10 +471,60 @@ elif st.session_state.current_view == 'player_gamelog':
                 )
                 
                 if stats_to_compare:
-                    avg_stats = modified_game_log[stats_to_compare].mean()
-                    fig = px.bar(avg_stats, title="Average Stats Comparison")
-                    st.plotly_chart(fig, use_container_width=True, key="bar_chart_viz")
+                    with span("render.bar_chart"):
+                        avg_stats = modified_game_log[stats_to_compare].mean().rename_axis('Stat').reset_index(name='Average')
+                        fig = bar_chart(avg_stats, 'Stat', 'Average', "Average Stats Comparison")
+                        st.plotly_chart(fig, use_container_width=True, key="bar_chart_viz")
         else:
-            st.error(f"Failed to retrieve player data. HTTP Status Code: {response.status_code}")
+            st.error(f"Failed to retrieve player data. HTTP Status Code: {page.status_code}")
     except Exception as e:
         st.error(f"An error occurred loading player game log: {e}")
+
+# Performance panel: stage timings of this rerun plus process-wide metrics
+run_spans = finish_trace(run_trace, f"view.{st.session_state.current_view}")
+if st.session_state.get('debug_panel'):
+    with st.sidebar:
+        st.markdown("### ⏱️ Performance")
+        metrics = metrics_snapshot()
+        st.caption(
+            f"Reruns: {st.session_state.rerun_count} this session, "
+            f"{metrics['counters'].get('app_reruns_total', 0)} in this process"
+        )
+
+        # Same stage may run several times in one rerun (e.g. one parse per table)
+        stage_totals = {}
+        for name, seconds in run_spans:
+            calls, total = stage_totals.get(name, (0, 0.0))
+            stage_totals[name] = (calls + 1, total + seconds)
+        st.dataframe(
+            [{"Stage": name, "Calls": calls, "ms": round(total * 1000, 1)} for name, (calls, total) in stage_totals.items()],
+            hide_index=True, use_container_width=True,
+        )
+
+        http_stats = cache_stats()
+        downloaded = metrics['counters'].get('http_bytes_downloaded_total', 0)
+        st.caption(
+            f"Downloaded {downloaded / 1024:.0f} KiB in {metrics['counters'].get('http_requests_total', 0)} requests; "
+            f"HTTP cache hit ratio {http_stats['hit_ratio']:.0%}"
+        )
+
+        with st.expander("Latency since start"):
+            st.dataframe(
+                [
+                    {"Stage": name, "Count": s['count'], "p50 ms": round(s['p50'] * 1000, 1),
+                     "p90 ms": round(s['p90'] * 1000, 1), "Max ms": round(s['max'] * 1000, 1)}
+                    for name, s in sorted(metrics['spans'].items())
+                ],
+                hide_index=True, use_container_width=True,
+            )
+        with st.expander("Memory caches"):
+            st.caption(f"{memory_cache_bytes() / 2 ** 20:.1f} MiB of {memory_budget() / 2 ** 20:.0f} MiB budget")
+            st.dataframe(
+                [
+                    {"Cache": name, "Entries": s['entries'], "KiB": round(s['bytes'] / 1024), "Hits": s['hits'],
+                     "Misses": s['misses'], "Coalesced": s['coalesced'], "Hit ratio": f"{s['hit_ratio']:.0%}"}
+                    for name, s in sorted(memory_cache_stats().items())
+                ],
+                hide_index=True, use_container_width=True,
+            )
+        st.download_button("Export metrics", prometheus_text(), "bref_metrics.prom", "text/plain")
@@ -0,0 +1,279 @@
+"""Process-wide bounded caches for parsed data.
+
+Streamlit imports engine modules once per process, so a cache held at module
+level is shared by every browser session (the same scope as
+st.cache_resource) without tying the engine to Streamlit. Each cache is an
+LRU with a maximum entry count and optional per-entry expiry.
+
+Together the caches stay under one memory budget (BREF_MEMORY_BUDGET_MB,
+512 MiB by default): every entry is sized when stored, DataFrames with
+memory_usage(deep=True), and once the total is over budget the least
+recently used entries across all caches are evicted. get_or_build (and so
+memoize) is single-flight: concurrent callers for a missing key wait for one
+build instead of each fetching and parsing the same page.
+"""
+import functools
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+MEMORY_BUDGET = int(float(os.environ.get("BREF_MEMORY_BUDGET_MB", "512")) * 2 ** 20)
+# How far estimate_bytes follows containers and object attributes
+SIZE_DEPTH = 4
+
+_registry = {}
+_registry_lock = threading.Lock()
+_budget_lock = threading.Lock()
+_budget = MEMORY_BUDGET
+# Recency stamps shared by every cache, so their entries can be compared
+_clock = itertools.count()
+
+
+def estimate_bytes(value, depth=SIZE_DEPTH, _seen=None):
+    """Approximate memory held by value: deep DataFrame/array sizes plus containers and attributes"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    if depth <= 0 or isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        items = itertools.chain.from_iterable(value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    elif hasattr(value, '__dict__'):
+        items = vars(value).values()
+    else:
+        return size
+    return size + sum(estimate_bytes(item, depth - 1, _seen) for item in items)
+
+
+class LRUCache:
+    """Thread-safe LRU with an entry limit and optional time-to-live per entry"""
+
+    def __init__(self, name, max_entries=128, ttl=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> [value, expires, bytes, last used]
+        self._building = {}            # key -> Future of the build in progress
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        with _registry_lock:
+            _registry[name] = self
+
+    def _live(self, key):
+        """Entry for key if present and not expired (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry[2]
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            entry[3] = next(_clock)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._live(key) is not None
+
+    def put(self, key, value, ttl=None):
+        """Store value; ttl overrides the cache default (None falls back to it)"""
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        size = estimate_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = [value, expires, size, next(_clock)]
+            self.bytes += size
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        _enforce_budget(keep=(self, key))
+
+    def get_or_build(self, key, build, ttl=None, cache_if=None):
+        """Cached value for key, or build() stored under it.
+
+        Concurrent callers for the same missing key wait for a single build and
+        share its result (or its exception). cache_if, when given, decides
+        whether the built value is kept.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                return entry[0]
+            future = self._building.get(key)
+            leader = future is None
+            if leader:
+                future = self._building[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            value = build()
+            if cache_if is None or cache_if(value):
+                self.put(key, value, ttl)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._remove(key) if key in self._entries else None
+        return default if entry is None else entry[0]
+
+    def _oldest(self):
+        """(last used, key) of the least recently used entry, or None"""
+        with self._lock:
+            if not self._entries:
+                return None
+            key = next(iter(self._entries))
+            return self._entries[key][3], key
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'coalesced': self.coalesced,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+def memoize(name, max_entries=128, ttl=None, cache_if=None):
+    """Cache a function's results in a shared LRUCache keyed by its arguments.
+
+    cache_if, when given, is called with each result and only results it
+    accepts are kept (so failed fetches are retried on the next call).
+    Concurrent calls with the same arguments run the function once. Arguments
+    are bound to the signature with defaults applied, so f(), f(2025) and
+    f(season=2025) share one entry when 2025 is the default.
+    """
+    def decorator(func):
+        cache = LRUCache(name, max_entries, ttl)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (bound.args, tuple(sorted(bound.kwargs.items())))
+            return cache.get_or_build(key, lambda: func(*args, **kwargs), cache_if=cache_if)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+_MISSING = object()
+
+
+def _caches():
+    with _registry_lock:
+        return list(_registry.values())
+
+
+def memory_usage():
+    """Estimated bytes held by every registered cache"""
+    return sum(cache.bytes for cache in _caches())
+
+
+def memory_budget():
+    """Current shared memory budget in bytes"""
+    return _budget
+
+
+def set_memory_budget(max_bytes):
+    """Change the shared memory budget and evict down to it"""
+    global _budget
+    _budget = max_bytes
+    _enforce_budget()
+
+
+def _enforce_budget(keep=None):
+    """Evict least recently used entries across all caches until under budget.
+
+    keep, a (cache, key) pair, is never evicted so a value larger than the
+    whole budget can still be returned from the cache it was just put in.
+    """
+    if memory_usage() <= _budget:
+        return
+    with _budget_lock:
+        caches = _caches()
+        while sum(cache.bytes for cache in caches) > _budget:
+            candidates = [(oldest, cache) for cache in caches if (oldest := cache._oldest()) is not None
+                          and (cache, oldest[1]) != keep]
+            if not candidates:
+                break
+            (_, key), cache = min(candidates, key=lambda candidate: candidate[0][0])
+            with cache._lock:
+                if key in cache._entries:
+                    cache._remove(key)
+                    cache.evictions += 1
+
+
+def all_stats():
+    """Stats for every registered cache, keyed by cache name"""
+    return {cache.name: cache.stats() for cache in _caches()}
+
+
+def clear_all():
+    """Empty every registered cache (stats are kept)"""
+    for cache in _caches():
+        cache.clear()
@@ -0,0 +1,140 @@
+"""Multi-season career gamelogs.
+
+Every season of a player's career is requested at once on the shared
+prefetch pool (bounded by PREFETCH_WORKERS and the global rate limit).
+iter_career yields the combined frame each time another season arrives, so
+callers can render partial careers while slower pages are still loading.
+"""
+import re
+from concurrent.futures import TimeoutError, as_completed
+
+import pandas as pd
+
+import store
+from cache import LRUCache, memoize
+from fetch import fetch, page_ttl, TTL_TEAM
+from gamelog import gamelog_url, load_gamelog, player_id_from_url, prefetch_gamelogs
+from metrics import span
+from parse import parse_page
+
+SUMMARY_STATS = ('PTS', 'TRB', 'AST', '3P', 'SEC')
+# How long the app waits for a career before analysing the seasons it has
+CAREER_TIMEOUT = 30
+
+_careers = LRUCache('careers', max_entries=16)
+
+
+def player_page_url(url):
+    """Player page URL for a player or gamelog URL"""
+    return re.sub(r'/gamelog/\d{4}/?$', '.html', url)
+
+
+@memoize('player_seasons', max_entries=256, ttl=TTL_TEAM, cache_if=bool)
+def player_seasons(player_url):
+    """Seasons with a regular-season gamelog, oldest first, read from the player page.
+
+    Falls back to the seasons already in the local store when the player page
+    cannot be fetched.
+    """
+    player_url = player_page_url(player_url)
+    response = fetch(player_url)
+    seasons = set()
+    if response.status_code == 200:
+        for href in parse_page(response.content).xpath('//a[contains(@href, "/gamelog/")]/@href'):
+            match = re.search(r'/gamelog/(\d{4})/?$', href)
+            if match:
+                seasons.add(int(match.group(1)))
+    if not seasons:
+        player_id = player_id_from_url(player_url)
+        seasons.update(store.stored_seasons(player_id) if player_id else ())
+    return sorted(seasons)
+
+
+def combine_seasons(logs):
+    """Concatenate {season: game_log} into one date-ordered frame with a Season column"""
+    frames = []
+    for season, game_log in sorted(logs.items()):
+        if game_log is None or game_log.empty:
+            continue
+        frames.append(game_log.assign(Season=season))
+    if not frames:
+        return pd.DataFrame()
+    career = pd.concat(frames)
+    # Each season brings its own opponent categories, so re-derive them once
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            career[col] = career[col].astype('category')
+    career['Season'] = pd.Categorical(career['Season'], categories=sorted(logs), ordered=True)
+    return career
+
+
+def season_summary(career, stats=SUMMARY_STATS):
+    """Games played and per-game averages of stats for each season in a career frame"""
+    if career.empty:
+        return pd.DataFrame(columns=['Season', 'Games'])
+    present = [stat for stat in stats if stat in career.columns]
+    grouped = career.groupby('Season', observed=True)
+    summary = grouped[present].mean().astype('float64').round(1)
+    summary.insert(0, 'Games', grouped[present[0]].count() if present else grouped.size())
+    return summary.reset_index()
+
+
+def iter_career(player_url, seasons=None, timeout=None):
+    """Load every season and yield (done, total, career, pending) as seasons arrive.
+
+    career is the combined frame of the seasons loaded so far and pending the
+    seasons still outstanding. With timeout (seconds), iteration stops once it
+    has passed; the seasons that were not ready keep loading in the background
+    and are picked up by the next call.
+    """
+    player_url = player_page_url(player_url)
+    seasons = list(seasons if seasons is not None else player_seasons(player_url))
+    key = (player_url, tuple(seasons))
+    career = _careers.get(key)
+    if career is not None:
+        yield len(seasons), len(seasons), career, []
+        return
+
+    urls = {gamelog_url(player_url, season): season for season in seasons}
+    futures = prefetch_gamelogs(urls)
+    # Seasons already parsed in memory are available immediately
+    logs = {season: _game_log(load_gamelog, url) for url, season in urls.items() if url not in futures}
+    pending = [season for url, season in urls.items() if url in futures]
+    career = combine_seasons(logs)
+    if logs or not pending:
+        yield len(logs), len(seasons), career, list(pending)
+
+    owners = {future: urls[url] for url, future in futures.items()}
+    try:
+        for future in as_completed(owners, timeout=timeout):
+            season = owners[future]
+            logs[season] = _game_log(future.result)
+            pending.remove(season)
+            with span("career.combine"):
+                career = combine_seasons(logs)
+            yield len(logs), len(seasons), career, list(pending)
+    except TimeoutError:
+        return
+
+    if any(game_log is None for game_log in logs.values()):
+        # Retry failed seasons next time instead of caching a partial career
+        return
+    ttls = [page_ttl(url) for url in urls if page_ttl(url) is not None]
+    _careers.put(key, career, ttl=min(ttls) if ttls else None)
+
+
+def _game_log(load, *args):
+    """Game log from a load call, or None when the season failed to load"""
+    try:
+        page = load(*args)
+    except Exception:
+        return None
+    return page.game_log if page is not None and page.status_code == 200 else None
+
+
+def load_career(player_url, seasons=None, timeout=None):
+    """Combined career frame (blocking until every season loads, or timeout passes)"""
+    career = pd.DataFrame()
+    for _, _, career, _ in iter_career(player_url, seasons, timeout):
+        pass
+    return career
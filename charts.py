@@ -0,0 +1,113 @@
+"""Plotly figures for the app, built for large gamelogs.
+
+Line traces use WebGL (Scattergl) and are downsampled server-side with
+Largest-Triangle-Three-Buckets once a trace has more than POINT_BUDGET
+points, so multi-season data stays a small figure spec. Built figures are
+cached on (data fingerprint, columns, chart options): a rerun that shows
+the same data reuses the figure instead of rebuilding and validating it.
+
+plotly is imported on first use, like in the app's chart views.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from metrics import span
+
+POINT_BUDGET = 1000
+FIGURE_CACHE_SIZE = 64
+
+_figures = LRUCache('figures', max_entries=FIGURE_CACHE_SIZE)
+
+
+def lttb(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps to draw y over x with threshold points"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    # Interior points are split into threshold - 2 equal buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        following = slice(end, edges[bucket + 2]) if bucket + 2 < len(edges) else slice(n - 1, n)
+        next_x, next_y = x[following].mean(), y[following].mean()
+        # Point forming the largest triangle with the last kept point and the next bucket's average
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[bucket + 1] = previous
+    return keep
+
+
+def fingerprint(frame, columns=None):
+    """Stable digest of frame's index and the given columns' values"""
+    data = frame if columns is None else frame[list(columns)]
+    hashed = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    digest = hashlib.blake2b(hashed.tobytes(), digest_size=16)
+    digest.update(repr((list(data.columns), [str(dtype) for dtype in data.dtypes])).encode())
+    return digest.hexdigest()
+
+
+def _axis_values(values):
+    """Numeric view of x values for LTTB (datetimes as int64 nanoseconds)"""
+    if isinstance(values, pd.DatetimeIndex) or np.issubdtype(np.asarray(values).dtype, np.datetime64):
+        return np.asarray(values, dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _cached(key, build):
+    def timed_build():
+        with span("chart.build"):
+            return build()
+    return _figures.get_or_build(key, timed_build)
+
+
+def line_chart(frame, y, title, x=None, height=400, markers=False, yaxis_title=None, vline=None):
+    """WebGL line chart of columns y over column x (the index by default), downsampled above POINT_BUDGET"""
+    y = [y] if isinstance(y, str) else list(y)
+    key = ('line', fingerprint(frame, y + ([x] if x is not None else [])), tuple(y), x, title, height,
+           markers, yaxis_title, vline)
+
+    def build():
+        import plotly.graph_objects as go
+
+        x_values = frame.index if x is None else frame[x]
+        numeric_x = _axis_values(x_values)
+        figure = go.Figure()
+        for column in y:
+            values = frame[column].to_numpy(dtype=np.float64)
+            points = np.arange(len(values))
+            if len(values) > POINT_BUDGET:
+                points = points[~np.isnan(values)]
+                points = points[lttb(numeric_x[points], values[points], POINT_BUDGET)]
+            figure.add_trace(go.Scattergl(
+                x=np.asarray(x_values)[points], y=values[points], name=str(column),
+                mode='lines+markers' if markers else 'lines',
+            ))
+        if vline is not None:
+            figure.add_vline(x=vline, line_dash="dash", line_color="gray")
+        figure.update_layout(
+            title=title, height=height, xaxis_title=x or (frame.index.name or ''),
+            yaxis_title=yaxis_title or (y[0] if len(y) == 1 else None), showlegend=len(y) > 1,
+        )
+        return figure
+    return _cached(key, build)
+
+
+def bar_chart(frame, x, y, title, height=400, categorical=False):
+    """Bar chart of column y against column x"""
+    key = ('bar', fingerprint(frame, [x, y]), x, y, title, height, categorical)
+
+    def build():
+        import plotly.graph_objects as go
+
+        figure = go.Figure(go.Bar(x=frame[x].astype(str) if categorical else frame[x], y=frame[y], name=str(y)))
+        figure.update_layout(title=title, height=height, xaxis_title=x, yaxis_title=y,
+                             xaxis_type='category' if categorical else None)
+        return figure
+    return _cached(key, build)
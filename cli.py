@@ -0,0 +1,131 @@
+"""Command-line entry point for the headless engine.
+
+    python cli.py teams
+    python cli.py roster BOS --season 2024
+    python cli.py gamelog tatumja01 --season 2024 --out tatum.parquet
+    python cli.py dump-gamelogs --season 2024 --out exports/ --processes 4
+    python cli.py screen slate.csv --last-n 10 --out results.csv
+    python cli.py defense --season 2024 --out defense.parquet
+    python cli.py serve --port 8765
+"""
+import argparse
+import sys
+
+import engine
+
+
+def _write(frame, out, index=False):
+    """Write frame to out (.parquet or .csv) or as CSV to stdout"""
+    if not out:
+        frame.to_csv(sys.stdout, index=index)
+    elif out.endswith('.parquet'):
+        frame.to_parquet(out, index=index)
+    else:
+        frame.to_csv(out, index=index)
+
+
+def _progress(done, total):
+    print(f"\r{done}/{total}", end='' if done < total else '\n', file=sys.stderr, flush=True)
+
+
+def cmd_teams(args):
+    _write(engine.get_nba_teams(args.season), args.out)
+
+
+def cmd_roster(args):
+    roster = engine.load_roster(engine.team_url(args.team, args.season))
+    if roster.roster is None:
+        sys.exit(f"Could not load roster for {args.team} (HTTP {roster.status_code})")
+    _write(roster.roster, args.out)
+
+
+def cmd_gamelog(args):
+    player_url = engine.resolve_player_url(args.player, args.season)
+    if player_url is None:
+        sys.exit(f"Unknown player: {args.player}")
+    page = engine.load_gamelog(engine.gamelog_url(player_url, args.season))
+    if page.status_code != 200:
+        sys.exit(f"Failed to retrieve player data. HTTP Status Code: {page.status_code}")
+    _write(page.game_log, args.out, index=True)
+
+
+def cmd_dump_gamelogs(args):
+    written, failed = engine.dump_gamelogs(
+        args.season, args.out, teams=args.teams, processes=args.processes, on_progress=_progress,
+    )
+    print(f"Wrote {len(written)} game logs to {args.out}", file=sys.stderr)
+    if failed:
+        print(f"{len(failed)} game logs failed:", *failed, sep='\n  ', file=sys.stderr)
+        sys.exit(1)
+
+
+def cmd_screen(args):
+    results = engine.screen_props(args.slate, season=args.season, last_n=args.last_n, on_progress=_progress)
+    _write(results, args.out)
+
+
+def cmd_defense(args):
+    defense = engine.league_defense(args.season)
+    if defense.empty:
+        sys.exit(f"No team defense data for {args.season}")
+    _write(defense, args.out, index=True)
+
+
+def cmd_serve(args):
+    from api import serve  # deferred: only the server needs asyncio and the HTTP layer
+
+    print(f"Serving on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        serve(args.host, args.port, args.workers)
+    except KeyboardInterrupt:
+        pass
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Basketball-Reference data engine")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    teams = subparsers.add_parser('teams', help="list NBA teams")
+    teams.set_defaults(func=cmd_teams)
+
+    roster = subparsers.add_parser('roster', help="print a team roster")
+    roster.add_argument('team', help="team abbreviation, e.g. BOS")
+    roster.set_defaults(func=cmd_roster)
+
+    gamelog = subparsers.add_parser('gamelog', help="print a player's cleaned game log")
+    gamelog.add_argument('player', help="bbref player id, player URL or player name")
+    gamelog.set_defaults(func=cmd_gamelog)
+
+    dump = subparsers.add_parser('dump-gamelogs', help="export every rostered player's game log to Parquet")
+    dump.add_argument('--teams', nargs='+', help="only these team abbreviations")
+    dump.add_argument('--processes', type=int, default=1, help="worker processes (they share the rate limit)")
+    dump.set_defaults(func=cmd_dump_gamelogs)
+
+    screen = subparsers.add_parser('screen', help="screen a CSV slate of player, stat, line rows")
+    screen.add_argument('slate', help="CSV file with player, stat, line (and optional opponent) columns")
+    screen.add_argument('--last-n', type=int, default=engine.DEFAULT_LAST_N)
+    screen.set_defaults(func=cmd_screen)
+
+    defense = subparsers.add_parser('defense', help="per-game stats every team allowed, one row per team")
+    defense.set_defaults(func=cmd_defense)
+
+    serve = subparsers.add_parser('serve', help="serve teams, rosters, gamelogs and hit rates over HTTP")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--workers', type=int, default=8, help="threads running engine calls")
+    serve.set_defaults(func=cmd_serve)
+
+    for sub in (teams, roster, gamelog, dump, screen, defense):
+        sub.add_argument('--season', type=int, default=engine.CURRENT_SEASON)
+        sub.add_argument('--out', required=sub is dump,
+                         help="output file (.csv or .parquet)" if sub is not dump else "output directory")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""League-wide opponent defense: the per-game stats each team allows.
+
+Every team page carries a team_and_opponent table (hidden in an HTML
+comment) with the totals and per-game averages its opponents recorded.
+league_defense fetches all team pages in parallel, under the global rate
+limit and through the HTTP cache the roster pages already use, and keeps
+one compact float32 row per team. Gamelogs then join against it on Opp in
+memory, so opponent-adjusted numbers need no further requests.
+
+Team pages only report opponents as a whole, so profiles are per team, not
+per position.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cache import memoize
+from fetch import fetch, CURRENT_SEASON, TTL_TEAM
+from gamelog import GAMELOG_SCHEMA
+from league import DIRECTORY_WORKERS, get_nba_teams, team_url
+from metrics import span
+from parse import parse_page, find_table, table_to_frame
+
+DEFENSE_TABLE_ID = 'team_and_opponent'
+# Counting stats kept per team, labelled like the gamelog columns they adjust
+DEFENSE_STATS = {stat: GAMELOG_SCHEMA[stat][0] for stat in (
+    'fg', 'fga', 'fg3', 'fg3a', 'ft', 'fta', 'orb', 'drb', 'trb', 'ast', 'stl', 'blk', 'tov', 'pf', 'pts',
+)}
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def parse_team_defense(root):
+    """{stat label: per-game value allowed} plus 'G' from a parsed team page; {} without the table.
+
+    Handles both bbref layouts: stacked Team / Opponent / Opponent/G rows, and
+    a single row with opp_-prefixed columns.
+    """
+    table = find_table(root, DEFENSE_TABLE_ID)
+    if table is None:
+        return {}
+    frame = table_to_frame(table, key='data-stat', typed=False)
+    if frame.empty:
+        return {}
+    rows = {str(label): row for label, row in zip(frame.iloc[:, 0], frame.to_dict('records'))}
+    games = _number(rows.get('Team', frame.iloc[0]).get('g'))
+
+    if 'Opponent/G' in rows:
+        allowed, per = rows['Opponent/G'], 1
+        allowed = {stat: allowed.get(stat) for stat in DEFENSE_STATS}
+    elif 'Opponent' in rows:
+        allowed, per = rows['Opponent'], games
+        allowed = {stat: allowed.get(stat) for stat in DEFENSE_STATS}
+    elif any(column.startswith('opp_') for column in frame.columns):
+        # Totals for the team's opponents sit next to its own in one row
+        allowed, per = frame.iloc[0], games
+        allowed = {stat: allowed.get(f'opp_{stat}') for stat in DEFENSE_STATS}
+    else:
+        return {}
+    if not per or np.isnan(per):
+        return {}
+
+    profile = {DEFENSE_STATS[stat]: _number(value) / per for stat, value in allowed.items()}
+    profile = {label: value for label, value in profile.items() if not np.isnan(value)}
+    if profile:
+        profile['G'] = games
+    return profile
+
+
+@memoize('team_defense', max_entries=256, ttl=TTL_TEAM, cache_if=bool)
+def team_defense(team_abbr, season=CURRENT_SEASON):
+    """Per-game stats team_abbr allowed in season ({} when the page or table is missing)"""
+    response = fetch(team_url(team_abbr, season))
+    if response.status_code != 200:
+        return {}
+    return parse_team_defense(parse_page(response.content))
+
+
+@memoize('league_defense', max_entries=16, ttl=TTL_TEAM, cache_if=len)
+@span("defense.league")
+def league_defense(season=CURRENT_SEASON):
+    """One float32 row per team (index Opp, the team abbreviation) of per-game stats allowed"""
+    abbreviations = get_nba_teams(season)['Abbreviation'].tolist()
+    with ThreadPoolExecutor(max_workers=DIRECTORY_WORKERS) as executor:
+        profiles = dict(zip(abbreviations, executor.map(lambda abbr: team_defense(abbr, season), abbreviations)))
+    frame = pd.DataFrame.from_dict({abbr: profile for abbr, profile in profiles.items() if profile}, orient='index')
+    frame.index.name = 'Opp'
+    return frame.astype('float32')
+
+
+def opponent_factors(season=CURRENT_SEASON):
+    """Stats allowed per team relative to the league average (1.1 = allows 10% more)"""
+    defense = league_defense(season).drop(columns='G', errors='ignore')
+    return defense / defense.mean()
+
+
+def opponent_adjusted(game_log, season=CURRENT_SEASON, stats=None):
+    """Stats of game_log divided by each game's opponent factor.
+
+    Games against teams missing from the defense table keep their raw values.
+    """
+    factors = opponent_factors(season)
+    stats = [stat for stat in (stats or factors.columns) if stat in factors.columns and stat in game_log.columns]
+    if 'Opp' not in game_log.columns or not stats:
+        return game_log[stats]
+    opponents = game_log['Opp'].astype(object)
+    per_game = factors[stats].reindex(opponents).fillna(1.0).to_numpy()
+    return pd.DataFrame(game_log[stats].to_numpy() / per_game, index=game_log.index, columns=stats)
@@ -0,0 +1,198 @@
+"""Headless data engine behind the Streamlit app and the CLI.
+
+Everything here can be imported without Streamlit: fetching and parsing
+team, roster and gamelog pages, cleaning gamelogs, prop analysis and bulk
+export. bref.py is a thin UI over these functions, and cli.py exposes them
+for batch jobs.
+"""
+import multiprocessing
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import store
+from career import CAREER_TIMEOUT, iter_career, load_career, player_seasons, season_summary
+from charts import bar_chart, line_chart
+from cache import (
+    LRUCache, all_stats as memory_cache_stats, memoize, memory_budget, memory_usage as memory_cache_bytes,
+    set_memory_budget,
+)
+from defense import league_defense, opponent_adjusted, opponent_factors, team_defense
+from analysis import ThresholdIndex, opponent_games, threshold_index
+from fetch import CURRENT_SEASON, TTL_TEAM, fetch, cache_stats, get_client
+from gamelog import (
+    GamelogPage, clean_gamelog, gamelog_url, load_gamelog, player_id_from_url, prefetch_gamelogs, season_from_url,
+)
+from league import get_nba_teams, player_index, roster_links, team_url
+from metrics import (
+    finish_trace, inc as inc_metric, prometheus_text, snapshot as metrics_snapshot, span,
+    start_server as start_metrics_server, start_trace,
+)
+from names import PlayerIndex, normalize_name
+from parse import parse_page, find_table, table_to_frame, table_links, first_text
+from screen import DEFAULT_LAST_N, resolve_player_url, screen_props
+from trends import TrendState, trends
+
+__all__ = [
+    'CAREER_TIMEOUT', 'CURRENT_SEASON', 'DEFAULT_LAST_N', 'GamelogPage', 'PlayerIndex', 'TeamRoster',
+    'ThresholdIndex', 'TrendState', 'bar_chart', 'cache_stats', 'clean_gamelog', 'dump_gamelogs', 'find_player_url',
+    'finish_trace', 'gamelog_url', 'get_nba_teams', 'inc_metric', 'iter_career', 'league_defense', 'line_chart',
+    'load_career', 'load_gamelog', 'load_roster', 'memory_budget', 'memory_cache_bytes', 'memory_cache_stats',
+    'metrics_snapshot', 'normalize_name', 'opponent_adjusted', 'opponent_factors', 'opponent_games',
+    'player_id_from_url', 'player_index', 'player_seasons', 'prefetch_gamelogs', 'prometheus_text', 'prop_summary',
+    'resolve_player_url', 'roster_links', 'screen_props', 'season_from_url', 'season_summary', 'set_memory_budget',
+    'span', 'start_metrics_server', 'start_trace', 'team_defense', 'team_url', 'threshold_index', 'trends',
+    'with_season',
+]
+
+_roster_indexes = LRUCache('roster_name_indexes', max_entries=64)
+
+TeamRoster = namedtuple('TeamRoster', ['url', 'status_code', 'team_name', 'roster', 'player_links'])
+
+TEAM_NAME_SELECTORS = [
+    '//h1[@itemprop="name"]//span',
+    '//h1[@data-testid="entity-name"]',
+    '//h1[contains(concat(" ", normalize-space(@class), " "), " teamname ")]',
+    '//h1',
+    '//div[@id="meta"]/div//h1',
+]
+
+
+def team_name_from_page(root):
+    """Extract the team name from a parsed team page, with several fallbacks"""
+    team_name = "NBA Team"  # Default fallback
+
+    full_text = first_text(root, TEAM_NAME_SELECTORS)
+    if full_text:
+        # Remove year information if present
+        team_name = re.sub(r'\s+\d{4}-\d{2,4}.*$', '', full_text)
+
+    # If still not found, try to extract from title
+    title = root.find('.//title')
+    if team_name == "NBA Team" and title is not None:
+        # Extract team name from title (usually in format "Team Name Roster...")
+        title_match = re.search(r'^(.*?)\s+Roster', title.text_content())
+        if title_match:
+            team_name = title_match.group(1).strip()
+    return team_name
+
+
+def find_player_url(player_name, player_links):
+    """Find a roster player's URL by exact, then normalized, then fuzzy name match"""
+    # Try direct match
+    if player_name in player_links:
+        return player_links[player_name]
+    return _links_index(player_links).url(player_name) or "N/A"
+
+
+def _links_index(player_links):
+    """PlayerIndex over one roster's links, built once per distinct roster"""
+    return _roster_indexes.get_or_build(tuple(player_links.items()), lambda: PlayerIndex.from_links(player_links))
+
+
+@memoize('rosters', max_entries=64, ttl=TTL_TEAM, cache_if=lambda team: team.roster is not None)
+def load_roster(url):
+    """Fetch a team page and return its TeamRoster (roster is None if the table is missing)"""
+    response = fetch(url)
+    if response.status_code != 200:
+        return TeamRoster(url, response.status_code, None, None, {})
+    root = parse_page(response.content)
+    team_name = team_name_from_page(root)
+
+    roster_element = find_table(root, 'roster')
+    if roster_element is None:
+        return TeamRoster(url, response.status_code, team_name, None, {})
+    roster = table_to_frame(roster_element)
+    player_links = table_links(roster_element, '/players/')
+
+    # Add player URLs to the roster table
+    if player_links and 'Player' in roster.columns:
+        index = _links_index(player_links)
+        roster['Profile URL'] = [player_links.get(name) or index.url(name) or "N/A" for name in roster['Player']]
+    return TeamRoster(url, response.status_code, team_name, roster, player_links)
+
+
+def with_season(url, season):
+    """Point a player or gamelog URL at the gamelog for season"""
+    base_url = url.split("/gamelog/")[0] if "/gamelog/" in url else url.replace(".html", "")
+    return f"{base_url}/gamelog/{season}"
+
+
+def prop_summary(game_log, stat, threshold, opponent=None, home=None, key=None):
+    """Summary stats plus over/under counts and percentages for one stat and line"""
+    index = threshold_index(key, game_log) if key is not None else ThresholdIndex(game_log)
+    summary = index.summary(stat, opponent, home)
+    over, under = index.counts(stat, threshold, opponent, home)
+    decided = over + under
+    summary.update(
+        over=over,
+        under=under,
+        over_pct=over / decided * 100 if decided else 0.0,
+        under_pct=under / decided * 100 if decided else 0.0,
+    )
+    return summary
+
+
+def _dump_urls(urls, season, out_dir, on_progress=None):
+    """Load each gamelog in urls and write it under out_dir; returns (written, failed)"""
+    written, failed = [], []
+    prefetch_gamelogs(urls)
+    for done, url in enumerate(urls, start=1):
+        if on_progress is not None and done > 1:
+            on_progress(done - 1, len(urls))
+        try:
+            # Joins the prefetch already in flight for this URL
+            page = load_gamelog(url)
+        except Exception:
+            page = None
+        player_id = player_id_from_url(url)
+        if page is None or page.status_code != 200 or player_id is None:
+            failed.append(url)
+            continue
+        store.write_gamelog(season, player_id, page.game_log, page.player_name, root=out_dir)
+        written.append(url)
+    if on_progress is not None and urls:
+        on_progress(len(urls), len(urls))
+    return written, failed
+
+
+def _dump_worker(urls, season, out_dir, rate):
+    # Each process gets its share of the global request budget
+    get_client().bucket.rate = rate
+    return _dump_urls(urls, season, out_dir)
+
+
+def dump_gamelogs(season, out_dir, teams=None, processes=1, on_progress=None):
+    """Export every rostered player's gamelog for season to Parquet under out_dir.
+
+    Files use the store layout (season=<season>/player_id=<id>.parquet).
+    With processes > 1 the players are split across worker processes that
+    share the request rate budget. on_progress(done, total) counts players,
+    or finished processes when processes > 1. Returns (written, failed) URL
+    lists.
+    """
+    if teams is None:
+        teams = get_nba_teams(season)['Abbreviation'].tolist()
+    urls = []
+    for team in teams:
+        for player_url in roster_links(team, season).values():
+            url = gamelog_url(player_url, season)
+            if url not in urls:
+                urls.append(url)
+
+    if processes <= 1:
+        return _dump_urls(urls, season, out_dir, on_progress)
+
+    rate = get_client().bucket.rate / processes
+    chunks = [urls[i::processes] for i in range(processes)]
+    written, failed = [], []
+    # spawn, not fork: the HTTP session, SQLite handle and thread pools must not be shared
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        results = executor.map(_dump_worker, chunks, [season] * processes, [out_dir] * processes, [rate] * processes)
+        for done, (chunk_written, chunk_failed) in enumerate(results, start=1):
+            written.extend(chunk_written)
+            failed.extend(chunk_failed)
+            if on_progress is not None:
+                on_progress(done, processes)
+    return written, failed
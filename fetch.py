@@ -0,0 +1,423 @@
+"""Shared fetch layer for Basketball-Reference pages.
+
+Every page the app needs goes through fetch(), which keeps responses in a
+local SQLite store keyed by URL. Fresh copies are served straight from disk,
+stale copies are revalidated with ETag / If-Modified-Since, and the store is
+trimmed back under its size budget by evicting the least recently used pages.
+
+Network requests go through one process-wide client: a keep-alive
+requests.Session, a token bucket shared by every Streamlit session, a cap on
+concurrent requests per host, and jittered exponential backoff on 429/5xx
+that honours Retry-After. Concurrent fetches of one URL share a single
+lookup and request.
+"""
+import email.utils
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import inc, span
+
+CURRENT_SEASON = 2025
+
+CACHE_PATH = os.environ.get(
+    "BREF_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "bref_http.sqlite"),
+)
+CACHE_MAX_BYTES = int(os.environ.get("BREF_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Cache hits record their access time in memory and write it in batches of this size
+ACCESS_FLUSH_EVERY = 64
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# Send requests somewhere other than bbref (e.g. the benchmark replay server).
+# Cache keys and every URL the app sees stay canonical.
+CANONICAL_ORIGIN = "https://www.basketball-reference.com"
+UPSTREAM = os.environ.get("BREF_UPSTREAM")
+
+# bbref allows roughly 20 requests per minute before it starts answering 429
+RATE_PER_SECOND = float(os.environ.get("BREF_RATE_PER_SECOND", 20 / 60))
+RATE_BURST = int(os.environ.get("BREF_RATE_BURST", 3))
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("BREF_MAX_CONNECTIONS_PER_HOST", 2))
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+REQUEST_TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Freshness per page type, in seconds (None = never goes stale)
+TTL_STANDINGS = 24 * 60 * 60
+TTL_TEAM = 24 * 60 * 60
+TTL_CURRENT_GAMELOG = 5 * 60
+TTL_FINISHED_GAMELOG = None
+
+
+def upstream_url(url):
+    """Rewrite a canonical bbref URL to the configured upstream, if any"""
+    if UPSTREAM and url.startswith(CANONICAL_ORIGIN):
+        return UPSTREAM.rstrip("/") + url[len(CANONICAL_ORIGIN):]
+    return url
+
+
+def page_ttl(url):
+    """Return how long a cached copy of url stays fresh, or None for forever"""
+    gamelog = re.search(r'/gamelog/(\d{4})', url)
+    if gamelog:
+        if int(gamelog.group(1)) < CURRENT_SEASON:
+            return TTL_FINISHED_GAMELOG
+        return TTL_CURRENT_GAMELOG
+    if "/teams/" in url:
+        return TTL_TEAM
+    return TTL_STANDINGS
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response, backed by a cache row or a live fetch"""
+
+    def __init__(self, url, status_code, content, headers=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+        self.encoding = "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class ResponseCache:
+    """URL-keyed response store on disk with LRU size eviction"""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._accessed = {}  # url -> last access not yet written
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints; a crash can lose the last
+        # commits (cache entries) but never corrupts the database
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is not None:
+                # A hit is a read; its access time only matters to eviction
+                self._accessed[url] = time.time()
+                if len(self._accessed) >= ACCESS_FLUSH_EVERY:
+                    self._flush_accessed()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return {"body": body, "etag": etag, "last_modified": last_modified, "fetched_at": fetched_at}
+
+    def _flush_accessed(self):
+        """Write pending access times (caller holds the lock)"""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE url = ?",
+                [(accessed, url) for url, accessed in self._accessed.items()],
+            )
+            self._conn.commit()
+            self._accessed.clear()
+
+    def put(self, url, body, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(url, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, len(body)),
+            )
+            self._conn.commit()
+        self.evict()
+
+    def touch(self, url):
+        """Mark a cached copy as fresh again after a 304 revalidation"""
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(url, None)
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def evict(self):
+        """Drop least recently used pages until the store fits its size budget"""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            self._flush_accessed()
+            evicted = 0
+            rows = self._conn.execute("SELECT url, size FROM responses ORDER BY last_access ASC")
+            victims = []
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                victims.append((url,))
+                total -= size
+                evicted += 1
+            self._conn.executemany("DELETE FROM responses WHERE url = ?", victims)
+            self._conn.commit()
+        with _stats_lock:
+            _stats["evictions"] += evicted
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HttpClient:
+    """Pooled, rate-limited HTTP client shared by the whole process"""
+
+    def __init__(self, rate=RATE_PER_SECOND, burst=RATE_BURST,
+                 max_per_host=MAX_CONNECTIONS_PER_HOST, max_retries=MAX_RETRIES):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_per_host, 1))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.bucket = TokenBucket(rate, burst)
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def get(self, url, headers=None):
+        """GET url, retrying 429/5xx and connection errors with backoff"""
+        slot = self._host_slot(url)
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                with slot:
+                    response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                return response
+            if attempt >= self.max_retries:
+                return response
+
+            delay = backoff_delay(attempt, response)
+            if delay is None:
+                # Server asked us to wait longer than we are willing to block
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt, response=None):
+    """Full-jitter exponential backoff, overridden by Retry-After when present.
+
+    Returns None when Retry-After asks for more than BACKOFF_MAX.
+    """
+    retry_after = retry_after_seconds(response)
+    if retry_after is not None:
+        if retry_after > BACKOFF_MAX:
+            return None
+        return retry_after + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide HTTP client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+_stats_lock = threading.Lock()
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide response cache, opening it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def cache_stats():
+    """Return hit/miss counters for the fetch cache"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"] + stats["revalidated"]
+    stats["hit_ratio"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+    stats["bytes"] = get_cache().total_bytes()
+    return stats
+
+
+def fetch(url, ttl=None, headers=None):
+    """Fetch url through the on-disk cache.
+
+    A copy younger than its TTL is returned without touching the network.
+    Older copies are revalidated with a conditional request and reused on 304,
+    or when bbref still answers 429/5xx after retries. Only 200 responses are
+    stored. Callers fetching the same URL at the same
+    time wait for one request and share its response (or its exception).
+    """
+    key = (url, ttl, tuple(sorted((headers or {}).items())))
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+    if not leader:
+        inc("http_coalesced_total")
+        return future.result()
+    try:
+        response = _fetch(url, ttl, headers)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(response)
+        return response
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def _fetch(url, ttl, headers):
+    cache = get_cache()
+    if ttl is None:
+        ttl = page_ttl(url)
+
+    cached = cache.get(url)
+    if cached is not None and (ttl is None or time.time() - cached["fetched_at"] < ttl):
+        _count("hits")
+        return CachedResponse(url, 200, cached["body"], from_cache=True)
+
+    request_headers = dict(headers or {})
+    if cached is not None:
+        if cached["etag"]:
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    with span("http.get"):
+        response = get_client().get(upstream_url(url), headers=request_headers)
+    inc("http_requests_total")
+    inc("http_bytes_downloaded_total", len(response.content))
+
+    if response.status_code == 304 and cached is not None:
+        _count("revalidated")
+        cache.touch(url)
+        return CachedResponse(url, 200, cached["body"], dict(response.headers), from_cache=True)
+
+    if response.status_code in RETRY_STATUSES and cached is not None:
+        # Rate limited or failing upstream: a stale copy beats an error page
+        inc("http_stale_served_total")
+        return CachedResponse(url, 200, cached["body"], dict(response.headers), from_cache=True)
+
+    _count("misses")
+    if response.status_code == 200:
+        cache.put(
+            url,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return CachedResponse(url, response.status_code, response.content, dict(response.headers))
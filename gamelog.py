@@ -0,0 +1,320 @@
+"""Player gamelog loading, cleaning and roster-wide prefetch.
+
+Parsed gamelogs are kept in a process-wide LRU keyed by URL so that
+switching between players or seasons that were already loaded (or
+prefetched) does not fetch or parse again. Prefetching runs on a shared
+worker pool; every worker still goes through fetch(), so the global rate
+limit applies to all of them together.
+
+Cleaned gamelogs are also persisted to the columnar store: finished seasons
+are read back from disk without any request, and current-season refreshes
+only clean and append the games played since the last stored date.
+"""
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+import store
+from cache import LRUCache
+from fetch import fetch, page_ttl, CURRENT_SEASON
+from metrics import span
+from parse import parse_page, find_table, table_to_frame
+
+GAMELOG_TABLE_IDS = ('pgl_basic', 'player_game_log_reg')
+DATE_STATS = ('date_game', 'date')
+PREFETCH_WORKERS = 4
+PARSED_CACHE_SIZE = 64
+
+GamelogPage = namedtuple('GamelogPage', ['url', 'status_code', 'player_name', 'game_log'])
+
+# Parsed pages expire with the same TTL as their HTTP cache entry, so
+# current-season gamelogs are re-read after a few minutes
+_parsed = LRUCache('gamelogs', max_entries=PARSED_CACHE_SIZE)
+_parsed_lock = threading.RLock()
+_in_flight = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def gamelog_url(player_url, season):
+    """Turn a player page URL into the gamelog URL for season"""
+    return player_url.replace(".html", f"/gamelog/{season}")
+
+
+def player_id_from_url(url):
+    """Return the bbref player id (e.g. 'tatumja01') embedded in a player URL"""
+    if "/players/" in url:
+        player_path = url.split("/players/")[1].split("/")
+        if len(player_path) > 1:
+            return player_path[1].replace(".html", "")
+    return None
+
+
+def season_from_url(url):
+    """Return the season encoded in a gamelog URL, or None"""
+    match = re.search(r'/gamelog/(\d{4})', url)
+    return int(match.group(1)) if match else None
+
+
+def player_name_from_id(player_id):
+    """Fallback display name derived from a bbref player id, for pages without a name"""
+    name_parts = re.findall(r'([a-z]+)([0-9]+)', player_id or '')
+    if name_parts:
+        return name_parts[0][0].capitalize()
+    return "Player"
+
+
+def player_name_from_page(root, player_id=None):
+    """Extract the player's display name from a parsed gamelog page"""
+    try:
+        # Try multiple selectors to find player name
+        player_name_element = root.xpath('//h1[@itemprop="name"]//span')
+        if player_name_element:
+            return player_name_element[0].text_content()
+        # Alternative selector for player name
+        player_name_element = root.xpath('//h1')
+        if player_name_element:
+            # Remove "Game Log" and year information if present
+            full_text = player_name_element[0].text_content().strip()
+            return re.sub(r'\s+Game Log.*$', '', full_text)
+        # Usually the last breadcrumb link is the player name
+        breadcrumb_links = root.xpath('//div[contains(@class, "breadcrumbs")]//a')
+        if breadcrumb_links:
+            return breadcrumb_links[-1].text_content()
+    except etree.XPathError:
+        pass
+    return player_name_from_id(player_id)
+
+
+# bbref data-stat -> (column label, kind). Both the classic pgl_basic layout
+# and the newer player_game_log_reg layout are covered; anything not listed
+# here (rank, age, team, result, game score, +/-) is dropped.
+GAMELOG_SCHEMA = {
+    'game_season': ('G', 'float32'),
+    'opp_id': ('Opp', 'category'),
+    'opp_name_abbr': ('Opp', 'category'),
+    'game_location': ('Home', 'home'),
+    'gs': ('GS', 'started'),
+    'is_starter': ('GS', 'started'),
+    'mp': ('SEC', 'seconds'),
+    'fg': ('FG', 'float32'),
+    'fga': ('FGA', 'float32'),
+    'fg_pct': ('FG%', 'float32'),
+    'fg3': ('3P', 'float32'),
+    'fg3a': ('3PA', 'float32'),
+    'fg3_pct': ('3P%', 'float32'),
+    'fg2': ('2P', 'float32'),
+    'fg2a': ('2PA', 'float32'),
+    'fg2_pct': ('2P%', 'float32'),
+    'efg_pct': ('eFG%', 'float32'),
+    'ft': ('FT', 'float32'),
+    'fta': ('FTA', 'float32'),
+    'ft_pct': ('FT%', 'float32'),
+    'orb': ('ORB', 'float32'),
+    'drb': ('DRB', 'float32'),
+    'trb': ('TRB', 'float32'),
+    'ast': ('AST', 'float32'),
+    'stl': ('STL', 'float32'),
+    'blk': ('BLK', 'float32'),
+    'tov': ('TOV', 'float32'),
+    'pf': ('PF', 'float32'),
+    'pts': ('PTS', 'float32'),
+}
+
+
+def _to_seconds(values):
+    """Parse "MM:SS" minutes played into seconds (NaN for games not played)"""
+    if values.empty:
+        # split(expand=True) of no rows has no columns to index
+        return pd.Series(index=values.index, dtype='float32')
+    parts = values.str.split(':', n=1, expand=True)
+    if parts.shape[1] < 2:
+        return pd.to_numeric(parts[0], errors='coerce').mul(60).astype('float32')
+    minutes = pd.to_numeric(parts[0], errors='coerce')
+    seconds = pd.to_numeric(parts[1], errors='coerce').fillna(0)
+    return (minutes * 60 + seconds).astype('float32')
+
+
+def _convert(values, kind):
+    if kind == 'float32':
+        return pd.to_numeric(values, errors='coerce').astype('float32')
+    if kind == 'category':
+        return values.astype('category')
+    if kind == 'seconds':
+        return _to_seconds(values)
+    if kind == 'started':
+        return values.isin(['1', '*']).astype('int8')
+    if kind == 'home':
+        # '' is a home game and '@' an away one; neutral-site games ('N') are neither
+        return values.map({'': True, '@': False}).astype('boolean')
+    raise ValueError(f"Unknown gamelog column kind: {kind}")
+
+
+@span("clean.gamelog")
+def clean_gamelog(raw):
+    """Convert a raw gamelog (string cells keyed by data-stat) in one pass.
+
+    Games are indexed by date so stored logs can be extended incrementally.
+    Stats become float32 (DNP rows stay NaN), Opp is categorical, minutes
+    played become SEC, GS is a 0/1 int8 and Home a nullable boolean (NA for
+    neutral-site games).
+    """
+    date_stat = next((stat for stat in DATE_STATS if stat in raw.columns), None)
+    if date_stat is not None:
+        index = pd.DatetimeIndex(pd.to_datetime(raw[date_stat], errors='coerce'), name='Date')
+    else:
+        index = pd.RangeIndex(len(raw))
+    known = [stat for stat in raw.columns if stat in GAMELOG_SCHEMA]
+    float_stats = [stat for stat in known if GAMELOG_SCHEMA[stat][1] == 'float32']
+    floats = _float_block(raw[float_stats]) if float_stats else None
+
+    columns = {}
+    for stat in known:
+        label, kind = GAMELOG_SCHEMA[stat]
+        if kind == 'float32':
+            columns[label] = floats[:, float_stats.index(stat)]
+        else:
+            columns[label] = _convert(raw[stat], kind).array
+    return pd.DataFrame(columns, index=index)
+
+
+def _float_block(raw):
+    """Convert all numeric stat columns to one float32 array in a single numpy cast"""
+    block = raw.to_numpy(dtype=object, copy=True)
+    block[block == ''] = 'nan'
+    try:
+        return block.astype(np.float32)
+    except ValueError:
+        # Stray non-numeric text in a stat cell; fall back to per-column coercion
+        return np.column_stack([_convert(raw[stat], 'float32').to_numpy() for stat in raw.columns])
+
+
+def _cached(url):
+    return _parsed.get(url)
+
+
+def _remember(page):
+    _parsed.put(page.url, page, ttl=page_ttl(page.url))
+
+
+def _newer_than(last):
+    """Row filter accepting only games dated after last"""
+    last_iso = last.strftime('%Y-%m-%d')
+
+    def accept(row):
+        for stat in DATE_STATS:
+            if stat in row:
+                return row[stat] > last_iso
+        return True
+    return accept
+
+
+def _load(url):
+    player_id = player_id_from_url(url)
+    season = season_from_url(url)
+    stored = None
+    if player_id and season:
+        stored = store.read_gamelog(season, player_id)
+        # Finished seasons never change, so the stored copy is final
+        if stored is not None and season < CURRENT_SEASON:
+            page = GamelogPage(url, 200, stored[0] or player_name_from_id(player_id), stored[1])
+            _remember(page)
+            return page
+
+    response = fetch(url)
+    if response.status_code != 200:
+        if stored is not None:
+            # Rate limited or bbref is down: the stored games are still usable
+            page = GamelogPage(url, 200, stored[0] or player_name_from_id(player_id), stored[1])
+            _remember(page)
+            return page
+        return GamelogPage(url, response.status_code, None, None)
+    root = parse_page(response.content)
+    table = find_table(root, *GAMELOG_TABLE_IDS)
+    if table is None:
+        raise ValueError("Could not find game log table on the player page.")
+    player_name = player_name_from_page(root, player_id)
+
+    last = store.last_stored_date(stored[1]) if stored is not None else None
+    if last is not None:
+        # Only games played since the last refresh are converted and appended
+        new_games = clean_gamelog(table_to_frame(table, key='data-stat', row_filter=_newer_than(last), typed=False))
+        game_log = store.append_games(season, player_id, stored[1], new_games, player_name)
+    else:
+        game_log = clean_gamelog(table_to_frame(table, key='data-stat', typed=False))
+        if player_id and season:
+            store.write_gamelog(season, player_id, game_log, player_name)
+
+    page = GamelogPage(url, response.status_code, player_name, game_log)
+    _remember(page)
+    return page
+
+
+def load_gamelog(url):
+    """Return the GamelogPage for url, reusing a parsed or in-flight copy.
+
+    Concurrent calls for one URL (from several sessions, the API or the
+    prefetch pool) share a single fetch and parse.
+    """
+    page = _cached(url)
+    if page is not None:
+        return page
+    with _parsed_lock:
+        future = _in_flight.get(url)
+        leader = future is None
+        if leader:
+            future = _in_flight[url] = Future()
+    if not leader:
+        with span("gamelog.wait_prefetch"):
+            return future.result()
+    try:
+        page = _load(url)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(page)
+        return page
+    finally:
+        _finish(url, future)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+        return _executor
+
+
+def _finish(url, future):
+    with _parsed_lock:
+        if _in_flight.get(url) is future:
+            del _in_flight[url]
+
+
+def prefetch_gamelogs(urls):
+    """Start loading every gamelog in urls on the shared worker pool.
+
+    Returns {url: future}. URLs that are already parsed or being fetched are
+    not submitted twice, and the work keeps running if the caller goes away.
+    """
+    executor = _get_executor()
+    futures = {}
+    for url in urls:
+        with _parsed_lock:
+            if url in _parsed:
+                continue
+            future = _in_flight.get(url)
+            if future is None:
+                future = executor.submit(_load, url)
+                _in_flight[url] = future
+                future.add_done_callback(lambda f, url=url: _finish(url, f))
+        futures[url] = future
+    return futures
+
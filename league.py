@@ -0,0 +1,86 @@
+"""League-level lookups: teams from the standings page and player links from rosters."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from cache import memoize
+from fetch import fetch, CURRENT_SEASON, TTL_STANDINGS, TTL_TEAM
+from names import PlayerIndex
+from parse import parse_page, find_table, table_links
+
+BASE_URL = "https://www.basketball-reference.com"
+DIRECTORY_WORKERS = 4
+NAMES_ROOT = os.environ.get(
+    "BREF_NAMES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "players"),
+)
+
+
+def standings_url(season=CURRENT_SEASON):
+    return f"{BASE_URL}/leagues/NBA_{season}.html"
+
+
+def team_url(team_abbr, season=CURRENT_SEASON):
+    return f"{BASE_URL}/teams/{team_abbr}/{season}.html"
+
+
+@memoize('teams', max_entries=16, ttl=TTL_STANDINGS)
+def get_nba_teams(season=CURRENT_SEASON):
+    """Retrieve current NBA teams from Basketball-Reference"""
+    response = fetch(standings_url(season))
+    if response.status_code != 200:
+        raise ValueError(f"Failed to retrieve standings. HTTP Status Code: {response.status_code}")
+    root = parse_page(response.content)
+
+    teams = []
+    # Find all team links in the standings tables
+    team_links = root.xpath('//table//a[contains(@href, "/teams/")]')
+
+    for link in team_links:
+        team_name = link.text_content()
+        team_abbr = link.get('href').split('/')[2]
+        if [team_name, team_abbr] not in teams:
+            teams.append([team_name, team_abbr])
+
+    # Remove duplicates and return as DataFrame
+    teams_df = pd.DataFrame(teams, columns=['Team', 'Abbreviation']).drop_duplicates()
+    return teams_df
+
+
+@memoize('roster_links', max_entries=256, ttl=TTL_TEAM, cache_if=bool)
+def roster_links(team_abbr, season=CURRENT_SEASON):
+    """Map player name to player page URL for one team's roster"""
+    response = fetch(team_url(team_abbr, season))
+    if response.status_code != 200:
+        return {}
+    roster = find_table(parse_page(response.content), 'roster')
+    return table_links(roster, '/players/') if roster is not None else {}
+
+
+def player_index_path(season):
+    return os.path.join(NAMES_ROOT, f"players_{season}.json")
+
+
+@memoize('player_index', max_entries=16, ttl=TTL_TEAM, cache_if=len)
+def player_index(season=CURRENT_SEASON):
+    """League-wide PlayerIndex for season, built from every roster page.
+
+    The index is saved to disk and reused across restarts: forever for
+    finished seasons, for TTL_TEAM for the current one. Team pages are
+    fetched in parallel (still under the global rate limit).
+    """
+    path = player_index_path(season)
+    index = PlayerIndex.load(path, max_age=TTL_TEAM if season >= CURRENT_SEASON else None)
+    if index is not None:
+        return index
+
+    abbreviations = get_nba_teams(season)['Abbreviation'].tolist()
+    index = PlayerIndex()
+    with ThreadPoolExecutor(max_workers=DIRECTORY_WORKERS) as executor:
+        for links in executor.map(lambda abbr: roster_links(abbr, season), abbreviations):
+            for name, url in links.items():
+                index.add(name, url)
+    if len(index):
+        index.save(path)
+    return index
@@ -0,0 +1,214 @@
+"""In-process instrumentation: timed spans, counters and their exporters.
+
+Engine code wraps each hot-path stage (HTTP, HTML parse, table extraction,
+cleaning, store I/O) in span(name). Every span feeds a process-wide summary
+(count, total, max and recent samples for quantiles); spans finished on a
+thread with an active trace are also collected for that trace, which is how
+the app shows the stage breakdown of the current rerun.
+
+Exports:
+- snapshot() for in-app display,
+- prometheus_text(), also served at /metrics by start_server(),
+- one JSON log line per span on the 'bref.metrics' logger (INFO), written
+  to the file named by BREF_METRICS_LOG when that is set.
+"""
+import contextlib
+import http.server
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from cache import all_stats
+
+SPAN_SAMPLES = 512
+QUANTILES = (0.5, 0.9, 0.99)
+METRICS_LOG = os.environ.get("BREF_METRICS_LOG")
+
+_log = logging.getLogger("bref.metrics")
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_local = threading.local()
+_server = None
+
+
+class SpanStats:
+    """Running summary of one span's durations"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SPAN_SAMPLES)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def quantile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def record(name, seconds):
+    """Add one finished span of duration seconds"""
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = SpanStats()
+        stats.add(seconds)
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.append((name, seconds))
+    if _log.isEnabledFor(logging.INFO):
+        _log.info(json.dumps({
+            "event": "span", "span": name, "ms": round(seconds * 1000, 3),
+            "thread": threading.current_thread().name, "ts": round(time.time(), 3),
+        }))
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time the enclosed block as span name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def inc(name, value=1):
+    """Increase counter name by value"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def start_trace():
+    """Start collecting this thread's spans; returns the trace handle for finish_trace"""
+    _local.trace = []
+    return (_local.trace, time.perf_counter())
+
+
+def finish_trace(trace, name=None):
+    """Stop collecting spans and return [(span, seconds), ...] in finish order.
+
+    With name, the trace's whole duration is also recorded as a span.
+    """
+    spans, start = trace
+    if getattr(_local, "trace", None) is spans:
+        _local.trace = None
+    if name is not None:
+        elapsed = time.perf_counter() - start
+        record(name, elapsed)
+        spans.append((name, elapsed))
+    return spans
+
+
+def snapshot():
+    """Current span summaries and counters as plain dicts"""
+    with _lock:
+        spans = {
+            name: {
+                "count": stats.count,
+                "total": stats.total,
+                "max": stats.max,
+                **{f"p{int(q * 100)}": stats.quantile(q) for q in QUANTILES},
+            }
+            for name, stats in _spans.items()
+        }
+        counters = dict(_counters)
+    return {"spans": spans, "counters": counters}
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format"""
+    # Imported here because fetch itself records spans through this module
+    from fetch import cache_stats
+
+    data = snapshot()
+    lines = [
+        "# HELP bref_span_seconds Duration of instrumented stages.",
+        "# TYPE bref_span_seconds summary",
+    ]
+    for name, stats in sorted(data["spans"].items()):
+        for q in QUANTILES:
+            lines.append(f'bref_span_seconds{{span="{_label(name)}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.6f}')
+        lines.append(f'bref_span_seconds_sum{{span="{_label(name)}"}} {stats["total"]:.6f}')
+        lines.append(f'bref_span_seconds_count{{span="{_label(name)}"}} {stats["count"]}')
+
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f"# TYPE bref_{name} counter")
+        lines.append(f"bref_{name} {value}")
+
+    http = cache_stats()
+    lines.append("# TYPE bref_http_cache_lookups_total counter")
+    for outcome in ("hits", "revalidated", "misses"):
+        lines.append(f'bref_http_cache_lookups_total{{outcome="{outcome}"}} {http[outcome]}')
+    lines.append("# TYPE bref_http_cache_evictions_total counter")
+    lines.append(f"bref_http_cache_evictions_total {http['evictions']}")
+    lines.append("# TYPE bref_http_cache_bytes gauge")
+    lines.append(f"bref_http_cache_bytes {http['bytes']}")
+    lines.append("# TYPE bref_http_cache_hit_ratio gauge")
+    lines.append(f"bref_http_cache_hit_ratio {http['hit_ratio']:.4f}")
+
+    memory = all_stats()
+    for metric, key, kind in (("memory_cache_entries", "entries", "gauge"),
+                              ("memory_cache_bytes", "bytes", "gauge"),
+                              ("memory_cache_coalesced_total", "coalesced", "counter"),
+                              ("memory_cache_hits_total", "hits", "counter"),
+                              ("memory_cache_misses_total", "misses", "counter"),
+                              ("memory_cache_evictions_total", "evictions", "counter"),
+                              ("memory_cache_hit_ratio", "hit_ratio", "gauge")):
+        lines.append(f"# TYPE bref_{metric} {kind}")
+        for name, stats in sorted(memory.items()):
+            lines.append(f'bref_{metric}{{cache="{_label(name)}"}} {stats[key]:g}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port, host="127.0.0.1"):
+    """Serve /metrics on a background thread; later calls return the running server"""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="bref-metrics", daemon=True).start()
+        return _server
+
+
+def _configure_log(path):
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _log.addHandler(handler)
+    _log.setLevel(logging.INFO)
+    _log.propagate = False
+
+
+if METRICS_LOG:
+    _configure_log(METRICS_LOG)
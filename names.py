@@ -0,0 +1,148 @@
+"""Player-name resolution: normalized name keys to bbref player ids.
+
+Names are normalized once when the index is built (accents and punctuation
+stripped, casefolded, "(TW)" markers and suffixes like Jr./III dropped), so
+lookups are a dict access. Names that do not match exactly fall back to a
+fuzzy match restricted to index entries sharing a name token with the query.
+"""
+import difflib
+import json
+import os
+import re
+import time
+import unicodedata
+
+FUZZY_CUTOFF = 0.85
+INDEX_VERSION = 1
+
+SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+# Letters NFKD does not decompose into a base letter plus accent
+_TRANSLITERATE = str.maketrans({'ø': 'o', 'Ø': 'O', 'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D',
+                                'ß': 'ss', 'æ': 'ae', 'Æ': 'AE', 'ı': 'i'})
+_PLAYER_ID = re.compile(r'/players/[a-z]/([^/.]+)')
+_PARENTHESIZED = re.compile(r'\(.*?\)')
+_PUNCTUATION = re.compile(r"[.'’`]")
+_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+
+def name_tokens(name):
+    """Casefolded ASCII tokens of a player name, suffixes included"""
+    text = unicodedata.normalize('NFKD', name.translate(_TRANSLITERATE))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    text = _PARENTHESIZED.sub(' ', text)
+    # "D'Angelo" -> "dangelo", "P.J." -> "pj"
+    text = _PUNCTUATION.sub('', text)
+    return _SEPARATORS.sub(' ', text).split()
+
+
+def _without_suffix(tokens):
+    end = len(tokens)
+    while end > 1 and tokens[end - 1] in SUFFIXES:
+        end -= 1
+    return tokens[:end]
+
+
+def normalize_name(name, strip_suffix=True):
+    """Lookup key for a player name: 'Jaren Jackson Jr.' and 'jaren jackson' give the same key"""
+    tokens = name_tokens(name)
+    return ' '.join(_without_suffix(tokens) if strip_suffix else tokens)
+
+
+def player_id_of(url):
+    match = _PLAYER_ID.search(url)
+    return match.group(1) if match else None
+
+
+class PlayerIndex:
+    """Name -> player id/URL lookups over a set of (display name, player URL) pairs"""
+
+    def __init__(self, links=()):
+        self._players = {}  # player id -> (name, url)
+        self._full = {}     # normalized name with suffix -> [ids]
+        self._base = {}     # normalized name without suffix -> [ids]
+        self._tokens = {}   # name token -> {base keys}
+        for name, url in links:
+            self.add(name, url)
+
+    @classmethod
+    def from_links(cls, player_links):
+        """Index a {display name: player URL} mapping such as TeamRoster.player_links"""
+        return cls(player_links.items())
+
+    def add(self, name, url):
+        player_id = player_id_of(url) or url
+        if player_id in self._players:
+            return
+        self._players[player_id] = (name, url)
+        tokens = name_tokens(name)
+        self._full.setdefault(' '.join(tokens), []).append(player_id)
+        base = ' '.join(_without_suffix(tokens))
+        self._base.setdefault(base, []).append(player_id)
+        for token in base.split():
+            self._tokens.setdefault(token, set()).add(base)
+
+    def __len__(self):
+        return len(self._players)
+
+    def __contains__(self, player_id):
+        return player_id in self._players
+
+    def lookup(self, name, fuzzy=True):
+        """Return the player id for name, or None when unknown or ambiguous"""
+        tokens = name_tokens(name)
+        ids = self._full.get(' '.join(tokens))
+        if ids and len(ids) == 1:
+            return ids[0]
+        base = ' '.join(_without_suffix(tokens))
+        ids = self._base.get(base)
+        if ids:
+            # Several players share the name (e.g. father and son) and the query
+            # had no suffix to tell them apart
+            return ids[0] if len(ids) == 1 else None
+        if fuzzy:
+            match = self._closest(base)
+            if match is not None and len(self._base[match]) == 1:
+                return self._base[match][0]
+        return None
+
+    def url(self, name, fuzzy=True):
+        """Return the player page URL for name, or None"""
+        player_id = self.lookup(name, fuzzy)
+        return self._players[player_id][1] if player_id is not None else None
+
+    def name(self, player_id):
+        """Display name of player_id as it appears on bbref"""
+        return self._players[player_id][0]
+
+    def _closest(self, base):
+        candidates = set()
+        for token in base.split():
+            candidates.update(self._tokens.get(token, ()))
+        if not candidates:
+            candidates = self._base.keys()
+        matches = difflib.get_close_matches(base, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        return matches[0] if matches else None
+
+    def save(self, path):
+        """Write the index to path as JSON, replacing any previous file atomically"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'players': list(self._players.values())}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, max_age=None):
+        """Read an index saved by save(); None if missing, outdated or older than max_age seconds"""
+        try:
+            if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+                return None
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION:
+            return None
+        return cls((name, url) for name, url in data['players'])
@@ -0,0 +1,144 @@
+"""Targeted table extraction for Basketball-Reference pages.
+
+Pages are parsed once with lxml and only the tables we ask for by id are
+turned into DataFrames. bbref hides many secondary tables inside HTML
+comments, so those are searched in the same pass. Columns are built from
+each cell's data-stat attribute, which does not depend on table order or on
+the header text lining up with the body.
+"""
+import re
+
+import lxml.html
+import pandas as pd
+from lxml import etree
+
+from metrics import span
+
+_NUMERIC = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)$')
+_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+
+@span("parse.html")
+def parse_page(content):
+    """Parse raw page bytes (bbref serves UTF-8) into an lxml tree"""
+    if isinstance(content, str):
+        return lxml.html.fromstring(content)
+    return lxml.html.fromstring(content, parser=_PARSER)
+
+
+@span("parse.find_tables")
+def find_tables(root, table_ids):
+    """Locate tables by id in a single walk over the page, including commented-out ones"""
+    wanted = set(table_ids)
+    found = {}
+    for node in root.iter("table", etree.Comment):
+        if not wanted - found.keys():
+            break
+        if node.tag == "table":
+            table_id = node.get("id")
+            if table_id in wanted and table_id not in found:
+                found[table_id] = node
+        elif node.text and 'id="' in node.text:
+            # bbref ships secondary tables as HTML inside comments
+            missing = [t for t in wanted - found.keys() if f'id="{t}"' in node.text]
+            if not missing:
+                continue
+            fragment = lxml.html.fragment_fromstring(node.text, create_parent="div")
+            for table in fragment.iter("table"):
+                if table.get("id") in missing:
+                    found[table.get("id")] = table
+    return found
+
+
+def find_table(root, *table_ids):
+    """Return the first of table_ids present on the page, or None"""
+    found = find_tables(root, table_ids)
+    for table_id in table_ids:
+        if table_id in found:
+            return found[table_id]
+    return None
+
+
+def table_columns(table):
+    """Return (data-stat, label) pairs from the innermost header row.
+
+    Blank headers are labelled "Unnamed: <i>" the way pandas.read_html does.
+    """
+    header_rows = [
+        row for row in table.xpath("./thead/tr")
+        if "over_header" not in (row.get("class") or "")
+    ]
+    if not header_rows:
+        return []
+    columns = []
+    seen = set()
+    for i, cell in enumerate(header_rows[-1].xpath("./th|./td")):
+        stat = cell.get("data-stat") or f"col{i}"
+        if stat in seen:
+            continue
+        seen.add(stat)
+        label = cell.text_content().strip() or f"Unnamed: {i}"
+        columns.append((stat, label))
+    return columns
+
+
+def table_rows(table):
+    """Yield {data-stat: text} for each body row, skipping repeated header rows"""
+    for row in table.xpath("./tbody/tr"):
+        row_class = row.get("class") or ""
+        if "thead" in row_class.split():
+            continue
+        yield {
+            cell.get("data-stat"): cell.text_content().strip()
+            for cell in row.xpath("./th|./td")
+        }
+
+
+def _typed(values):
+    """Convert a column of cell strings to numbers when every non-empty cell is numeric"""
+    non_empty = [v for v in values if v != ""]
+    if non_empty and all(_NUMERIC.match(v) for v in non_empty):
+        return pd.to_numeric(pd.Series([v if v != "" else None for v in values], dtype=object))
+    return pd.Series(values, dtype=object)
+
+
+@span("parse.table")
+def table_to_frame(table, key="label", row_filter=None, typed=True):
+    """Build a DataFrame from a bbref table element.
+
+    key="label" names columns by header text, key="data-stat" by the stat id.
+    row_filter, if given, is called with each {data-stat: text} row and only
+    rows it accepts are converted. typed=False leaves every cell as a string
+    for callers that apply their own schema.
+    """
+    columns = table_columns(table)
+    data = {stat: [] for stat, _ in columns}
+    for row in table_rows(table):
+        if row_filter is not None and not row_filter(row):
+            continue
+        for stat in data:
+            data[stat].append(row.get(stat, ""))
+    if typed:
+        frame = pd.DataFrame({stat: _typed(values) for stat, values in data.items()})
+    else:
+        frame = pd.DataFrame(data, dtype=object)
+    if key == "label":
+        frame.columns = [label for _, label in columns]
+    return frame
+
+
+def table_links(table, pattern):
+    """Map link text to absolute URL for links inside table whose href contains pattern"""
+    links = {}
+    for link in table.xpath(".//a[contains(@href, $pattern)]", pattern=pattern):
+        links[link.text_content()] = "https://www.basketball-reference.com" + link.get("href")
+    return links
+
+
+def first_text(root, xpaths):
+    """Return the stripped text of the first element matched by any of xpaths"""
+    for xpath in xpaths:
+        elements = root.xpath(xpath)
+        if elements:
+            return elements[0].text_content().strip()
+    return None
@@ -0,0 +1,147 @@
+"""Batch prop screening over a slate of (player, stat, line) rows.
+
+Missing gamelogs are fetched in parallel through the shared prefetch pool,
+then every line is scored in one vectorized pass over a stacked long-format
+frame of all players' games.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from fetch import CURRENT_SEASON
+from gamelog import GAMELOG_SCHEMA, gamelog_url, load_gamelog, prefetch_gamelogs, player_id_from_url
+from league import BASE_URL, player_index
+
+DEFAULT_LAST_N = 10
+
+_PLAYER_ID = re.compile(r'^[a-z]{2,}\d{2}$')
+# Slate stats are matched to gamelog columns case-insensitively ("pts" -> "PTS")
+_STAT_LABELS = {label.casefold(): label for label, _ in GAMELOG_SCHEMA.values()}
+
+
+def read_slate(source):
+    """Load a slate from a CSV path/buffer or DataFrame with player, stat and line columns"""
+    slate = source if isinstance(source, pd.DataFrame) else pd.read_csv(source)
+    slate = slate.rename(columns={col: col.strip().lower() for col in slate.columns})
+    missing = {'player', 'stat', 'line'} - set(slate.columns)
+    if missing:
+        raise ValueError(f"Slate is missing columns: {', '.join(sorted(missing))}")
+    slate = slate.copy()
+    slate['player'] = slate['player'].astype(str).str.strip()
+    slate['stat'] = slate['stat'].astype(str).str.strip()
+    slate['stat'] = slate['stat'].map(lambda stat: _STAT_LABELS.get(stat.casefold(), stat))
+    slate['line'] = pd.to_numeric(slate['line'], errors='coerce')
+    if 'opponent' not in slate.columns:
+        slate['opponent'] = None
+    return slate
+
+
+def resolve_player_url(player, season=CURRENT_SEASON):
+    """Accept a bbref player id, player URL or player name and return the player page URL"""
+    if player.startswith('http'):
+        return re.sub(r'/gamelog/\d{4}$', '.html', player)
+    if _PLAYER_ID.match(player):
+        return f"{BASE_URL}/players/{player[0]}/{player}.html"
+    return player_index(season).url(player)
+
+
+def _stacked_games(pages, stats):
+    """Long frame (player_id, Date, Opp, stat, value) of every played game"""
+    frames = []
+    for player_id, game_log in pages.items():
+        present = [stat for stat in stats if stat in game_log.columns]
+        if not present:
+            continue
+        frame = game_log[present + (['Opp'] if 'Opp' in game_log.columns else [])].copy()
+        frame['player_id'] = player_id
+        frames.append(frame.reset_index())
+    if not frames:
+        return pd.DataFrame(columns=['player_id', 'Date', 'Opp', 'stat', 'value'])
+    stacked = pd.concat(frames, ignore_index=True)
+    if 'Opp' not in stacked.columns:
+        stacked['Opp'] = None
+    stacked['Opp'] = stacked['Opp'].astype(object)
+    long = stacked.melt(id_vars=['player_id', 'Date', 'Opp'], var_name='stat', value_name='value')
+    long = long.dropna(subset=['value']).sort_values(['player_id', 'stat', 'Date'])
+    # 0 for the most recent game of each (player, stat), 1 for the one before, ...
+    long['recency'] = long.groupby(['player_id', 'stat']).cumcount(ascending=False)
+    return long
+
+
+def screen_props(slate, season=CURRENT_SEASON, last_n=DEFAULT_LAST_N, on_progress=None):
+    """Score every line in slate against the player's gamelog for season.
+
+    Returns one row per slate line with over/under hit rates over the last
+    last_n games, the whole season and (when an opponent is given) against
+    that opponent. on_progress(done, total) is called while gamelogs load.
+    """
+    slate = read_slate(slate).reset_index(drop=True)
+    slate['row'] = np.arange(len(slate))
+    player_urls, failed_lookups = {}, set()
+    for player in slate['player'].unique():
+        # A failed standings or roster fetch only affects the players that needed it
+        try:
+            player_urls[player] = resolve_player_url(player, season)
+        except Exception:
+            player_urls[player] = None
+            failed_lookups.add(player)
+    slate['player_id'] = slate['player'].map(
+        lambda player: player_id_from_url(player_urls[player]) if player_urls[player] else None
+    )
+
+    # Fetch every missing gamelog at once on the shared pool
+    urls = {gamelog_url(url, season): url for url in player_urls.values() if url}
+    futures = prefetch_gamelogs(urls)
+    pages = {}
+    for done, url in enumerate(urls, start=1):
+        try:
+            page = futures[url].result() if url in futures else load_gamelog(url)
+        except Exception:
+            page = None
+        if page is not None and page.status_code == 200:
+            pages[player_id_from_url(url)] = page.game_log
+        if on_progress is not None:
+            on_progress(done, len(urls))
+
+    long = _stacked_games(pages, slate['stat'].unique().tolist())
+    games = slate[['row', 'player_id', 'stat', 'line', 'opponent']].merge(
+        long, on=['player_id', 'stat'], how='inner'
+    )
+    over = games['value'] > games['line']
+    under = games['value'] < games['line']
+    recent = games['recency'] < last_n
+    vs_opp = games['Opp'].notna() & (games['Opp'] == games['opponent'])
+    flags = pd.DataFrame({
+        'row': games['row'],
+        'games': 1,
+        'season_over': over,
+        'season_under': under,
+        'recent_games': recent,
+        'recent_over': over & recent,
+        'recent_under': under & recent,
+        'recent_sum': games['value'].where(recent, 0.0),
+        'season_sum': games['value'],
+        'opp_games': vs_opp,
+        'opp_over': over & vs_opp,
+        'opp_under': under & vs_opp,
+    })
+    totals = flags.groupby('row').sum().reindex(slate['row'], fill_value=0)
+
+    def rate(over_col, under_col):
+        decided = totals[over_col] + totals[under_col]
+        return (totals[over_col] / decided.replace(0, np.nan) * 100).round(1).to_numpy()
+
+    result = slate[['player', 'stat', 'line', 'opponent']].copy()
+    result['Games'] = totals['games'].to_numpy()
+    result[f'L{last_n} Avg'] = (totals['recent_sum'] / totals['recent_games'].replace(0, np.nan)).round(1).to_numpy()
+    result[f'L{last_n} Over %'] = rate('recent_over', 'recent_under')
+    result['Season Avg'] = (totals['season_sum'] / totals['games'].replace(0, np.nan)).round(1).to_numpy()
+    result['Season Over %'] = rate('season_over', 'season_under')
+    result['Vs Opp Games'] = totals['opp_games'].to_numpy()
+    result['Vs Opp Over %'] = rate('opp_over', 'opp_under')
+    result['Status'] = np.select(
+        [slate['player'].isin(failed_lookups), slate['player_id'].isna(), result['Games'] == 0],
+        ['lookup failed', 'player not found', 'no games'], default='ok',
+    )
+    return result
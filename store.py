@@ -0,0 +1,103 @@
+"""Local columnar store for cleaned gamelogs.
+
+Each player's season is one Parquet file under
+<root>/season=<season>/player_id=<id>.parquet, indexed by game date. Files
+for finished seasons never change, so reading them back is a memory-mapped
+Arrow read with no network at all. Current-season files are extended in
+place with only the games played since the last stored date.
+"""
+import os
+
+import pandas as pd
+
+from metrics import span
+
+STORE_ROOT = os.environ.get(
+    "BREF_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gamelogs"),
+)
+
+_PLAYER_NAME_KEY = b"bref.player_name"
+_SCHEMA_KEY = b"bref.schema"
+# Bump when the cleaned gamelog columns or dtypes change; older files are ignored
+SCHEMA_VERSION = b"3"
+
+
+def partition_path(season, player_id, root=STORE_ROOT):
+    return os.path.join(root, f"season={season}", f"player_id={player_id}.parquet")
+
+
+@span("store.read")
+def read_gamelog(season, player_id, root=STORE_ROOT):
+    """Return (player_name, game_log) from the store, or None if not stored"""
+    path = partition_path(season, player_id, root)
+    if not os.path.exists(path):
+        return None
+    import pyarrow.parquet as pq  # deferred: only needed once a gamelog is loaded
+
+    table = pq.read_table(path, memory_map=True)
+    metadata = table.schema.metadata or {}
+    if metadata.get(_SCHEMA_KEY) != SCHEMA_VERSION:
+        return None
+    player_name = metadata.get(_PLAYER_NAME_KEY, b"").decode("utf-8") or None
+    return player_name, table.to_pandas()
+
+
+@span("store.write")
+def write_gamelog(season, player_id, game_log, player_name=None, root=STORE_ROOT):
+    """Write a full season for one player, replacing any stored copy atomically"""
+    path = partition_path(season, player_id, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(game_log, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_SCHEMA_KEY] = SCHEMA_VERSION
+    if player_name:
+        metadata[_PLAYER_NAME_KEY] = player_name.encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def last_stored_date(game_log):
+    """Date of the most recent stored game, or None for an empty log"""
+    if game_log is None or game_log.empty:
+        return None
+    return game_log.index.max()
+
+
+@span("store.append")
+def append_games(season, player_id, stored, new_games, player_name=None, root=STORE_ROOT):
+    """Append games newer than the stored ones and write the result back.
+
+    Returns the combined game log. Nothing is written when there is nothing new.
+    """
+    last = last_stored_date(stored)
+    if last is not None:
+        new_games = new_games[new_games.index > last]
+    if new_games.empty:
+        return stored
+    if stored is None or stored.empty:
+        combined = new_games
+    else:
+        combined = pd.concat([stored, new_games])
+        # Categories differ between chunks (new opponents), so re-derive them
+        for col in stored.columns:
+            if isinstance(stored[col].dtype, pd.CategoricalDtype):
+                combined[col] = combined[col].astype("category")
+    write_gamelog(season, player_id, combined, player_name, root)
+    return combined
+
+
+def stored_seasons(player_id, root=STORE_ROOT):
+    """Seasons stored on disk for player_id"""
+    seasons = []
+    if not os.path.isdir(root):
+        return seasons
+    for entry in os.listdir(root):
+        if entry.startswith("season=") and os.path.exists(partition_path(entry[7:], player_id, root)):
+            seasons.append(int(entry[7:]))
+    return sorted(seasons)
@@ -0,0 +1,18 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+# The engine modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the HTTP cache, gamelog store and name index out of the working tree;
+# set before the engine modules read them at import
+_scratch = tempfile.mkdtemp(prefix='bref-tests-')
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+os.environ.update(
+    BREF_CACHE_PATH=os.path.join(_scratch, 'http.sqlite'),
+    BREF_STORE_PATH=os.path.join(_scratch, 'store'),
+    BREF_NAMES_PATH=os.path.join(_scratch, 'players'),
+)
@@ -0,0 +1,149 @@
+"""Single-flight loading and the shared memory budget."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import api
+import cache
+import fetch
+import gamelog
+from cache import LRUCache
+from defense import team_defense
+from engine import load_roster
+from league import roster_links, team_url
+
+CALLERS = 8
+
+
+def concurrently(call, callers=CALLERS):
+    """Results of call() run from callers threads released at the same moment"""
+    return run_together([call] * callers)
+
+
+def run_together(calls):
+    """Results of every call in calls, each on its own thread, released at the same moment"""
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        barrier.wait()
+        return call()
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(run, call) for call in calls]
+        return [future.exception() or future.result() for future in futures]
+
+
+def slow_build(builds, result=None, error=None):
+    def build():
+        builds.append(threading.get_ident())
+        time.sleep(0.2)
+        if error is not None:
+            raise error
+        return result
+    return build
+
+
+@pytest.fixture
+def budget():
+    cache.clear_all()
+    original = cache.memory_budget()
+    yield
+    cache.set_memory_budget(original)
+    cache.clear_all()
+
+
+def test_get_or_build_builds_once_for_concurrent_callers():
+    lru = LRUCache('test_single_flight')
+    builds, value = [], object()
+    results = concurrently(lambda: lru.get_or_build('key', slow_build(builds, value)))
+    assert len(builds) == 1
+    assert all(result is value for result in results)
+    assert lru.stats()['coalesced'] == CALLERS - 1
+
+
+def test_get_or_build_shares_the_build_exception():
+    lru = LRUCache('test_shared_error')
+    builds, error = [], ValueError("parse failed")
+    results = concurrently(lambda: lru.get_or_build('key', slow_build(builds, error=error)))
+    assert len(builds) == 1
+    assert all(result is error for result in results)
+    assert 'key' not in lru
+    # The failure is not cached: the next call builds again
+    assert lru.get_or_build('key', lambda: 1) == 1
+
+
+def test_memoize_keys_calls_by_bound_arguments():
+    calls = []
+
+    @cache.memoize('test_memoize_defaults')
+    def teams(season=2025, league='NBA'):
+        calls.append((season, league))
+        return season, league
+    assert teams() == teams(2025) == teams(season=2025) == teams(2025, league='NBA') == (2025, 'NBA')
+    assert teams(2024) == (2024, 'NBA')
+    assert calls == [(2025, 'NBA'), (2024, 'NBA')]
+    assert len(teams.cache) == 2
+
+
+def test_load_gamelog_fetches_once_for_concurrent_callers(monkeypatch):
+    builds, page = [], object()
+    monkeypatch.setattr(gamelog, '_load', lambda url: slow_build(builds, page)())
+    url = 'https://example.test/players/t/tester01/gamelog/2025'
+    results = concurrently(lambda: gamelog.load_gamelog(url))
+    assert len(builds) == 1
+    assert all(result is page for result in results)
+    assert url not in gamelog._in_flight
+
+
+def test_team_page_is_fetched_once_for_every_cache_reading_it(monkeypatch):
+    cache.clear_all()
+    requests = []
+    body = b'<html><body><h1>Test Team</h1></body></html>'
+    monkeypatch.setattr(fetch, '_fetch', lambda url, ttl, headers: slow_build(
+        requests, fetch.CachedResponse(url, 200, body))())
+    calls = [lambda: roster_links('TST', 2025), lambda: load_roster(team_url('TST', 2025)),
+             lambda: team_defense('TST', 2025)] * 3
+    results = run_together(calls)
+    assert len(requests) == 1
+    assert not [result for result in results if isinstance(result, Exception)]
+    assert not fetch._in_flight
+
+
+def test_api_call_shares_one_response_between_identical_requests(monkeypatch):
+    builds, response = [], (200, api.JSON_TYPE, b'{}', False)
+    monkeypatch.setattr(api, 'respond', lambda *args: slow_build(builds, response)())
+    server = api.ApiServer(workers=CALLERS)
+
+    async def requests():
+        key = ('teams', None, (), False, False)
+        return await asyncio.gather(*(server._call(key, 'teams', None, {}) for _ in range(CALLERS)))
+    results = asyncio.run(requests())
+    assert len(builds) == 1
+    assert results == [response] * CALLERS
+    assert not server._in_flight
+
+
+def test_budget_evicts_least_recently_used_across_caches(budget):
+    first, second = LRUCache('test_budget_first'), LRUCache('test_budget_second')
+    block = np.zeros(1000)
+    first.put('a1', block.copy())
+    second.put('b1', block.copy())
+    first.put('a2', block.copy())
+    second.put('b2', block.copy())
+    first.get('a1')  # now the most recently used
+    cache.set_memory_budget(2 * block.nbytes)
+    assert 'b1' not in second and 'a2' not in first
+    assert 'a1' in first and 'b2' in second
+    assert cache.memory_usage() <= cache.memory_budget()
+    assert first.stats()['evictions'] == second.stats()['evictions'] == 1
+
+
+def test_value_over_budget_stays_in_its_cache(budget):
+    lru = LRUCache('test_budget_oversized')
+    cache.set_memory_budget(1024)
+    lru.put('small', np.zeros(10))
+    lru.put('large', np.zeros(1000))
+    assert 'large' in lru and 'small' not in lru
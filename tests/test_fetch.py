@@ -0,0 +1,65 @@
+"""The on-disk response cache."""
+import time
+
+import fetch
+from fetch import ResponseCache
+
+
+def test_hits_are_recorded_for_eviction_without_a_write_each(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'http.sqlite'), max_bytes=250)
+    cache.put('a', b'x' * 100)
+    cache.put('b', b'x' * 100)
+    time.sleep(0.01)
+    assert cache.get('a')['body'] == b'x' * 100
+    assert cache._accessed == {'a': cache._accessed['a']}
+    # Over budget: 'b' is now the least recently used even though 'a' was stored first
+    cache.put('c', b'x' * 100)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_access_times_are_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch, 'ACCESS_FLUSH_EVERY', 3)
+    cache = ResponseCache(str(tmp_path / 'http.sqlite'))
+    for url in 'abc':
+        cache.put(url, b'body')
+    cache.get('a')
+    cache.get('b')
+    assert len(cache._accessed) == 2
+    cache.get('c')
+    assert not cache._accessed
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b''):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+
+class FakeClient:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, headers=None):
+        return self.response
+
+
+def test_stale_copy_is_served_when_upstream_fails(monkeypatch):
+    url = 'https://www.basketball-reference.com/teams/TST/2025.html'
+    fetch.get_cache().put(url, b'stale page')
+    for status in (429, 503):
+        monkeypatch.setattr(fetch, 'get_client', lambda: FakeClient(FakeResponse(status)))
+        response = fetch.fetch(url, ttl=0)
+        assert (response.status_code, response.content, response.from_cache) == (200, b'stale page', True)
+
+
+def test_upstream_error_is_returned_without_a_cached_copy(monkeypatch):
+    url = 'https://www.basketball-reference.com/teams/NONE/2025.html'
+    monkeypatch.setattr(fetch, 'get_client', lambda: FakeClient(FakeResponse(429)))
+    response = fetch.fetch(url, ttl=0)
+    assert response.status_code == 429 and not response.from_cache
+    # A 404 is an answer, not an outage
+    fetch.get_cache().put(url, b'old page')
+    monkeypatch.setattr(fetch, 'get_client', lambda: FakeClient(FakeResponse(404)))
+    assert fetch.fetch(url, ttl=0).status_code == 404
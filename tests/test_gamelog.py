@@ -0,0 +1,109 @@
+"""Loading current-season gamelogs through the store."""
+import datetime
+import shutil
+
+import pandas as pd
+import pytest
+
+import cache
+import gamelog
+import store
+from analysis import ThresholdIndex
+from fetch import CURRENT_SEASON, CachedResponse
+
+URL = f"https://www.basketball-reference.com/players/t/testpl01/gamelog/{CURRENT_SEASON}"
+COLUMNS = [('date_game', 'Date'), ('game_location', ''), ('opp_id', 'Opp'), ('mp', 'MP'), ('pts', 'PTS')]
+
+
+def gamelog_html(games):
+    """Gamelog page with games played every other day from the season opener"""
+    head = "".join(f'<th data-stat="{stat}">{label}</th>' for stat, label in COLUMNS)
+    rows = []
+    for game in range(games):
+        date = datetime.date(CURRENT_SEASON - 1, 10, 22) + datetime.timedelta(days=2 * game)
+        cells = [date.isoformat(), '@' if game % 2 else '', 'BOS', f'{30 + game % 5}:{game % 60:02d}', str(game)]
+        rows.append("<tr>" + "".join(f'<td data-stat="{stat}">{value}</td>'
+                                     for (stat, _), value in zip(COLUMNS, cells)) + "</tr>")
+    return (f'<html><body><h1><span>Test Player</span></h1><table id="pgl_basic"><thead><tr>{head}</tr></thead>'
+            f'<tbody>{"".join(rows)}</tbody></table></body></html>').encode()
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Serve the gamelog page from pages['body']; start with an empty store and caches"""
+    shutil.rmtree(store.STORE_ROOT, ignore_errors=True)
+    cache.clear_all()
+    pages = {'status': 200}
+    monkeypatch.setattr(gamelog, 'fetch', lambda url: CachedResponse(url, pages['status'], pages['body']))
+    yield pages
+    cache.clear_all()
+
+
+def reload():
+    """Load URL again once the parsed copy has expired"""
+    cache.clear_all()
+    return gamelog.load_gamelog(URL)
+
+
+def test_refresh_with_no_new_games_keeps_the_stored_log(upstream):
+    upstream['body'] = gamelog_html(10)
+    first = gamelog.load_gamelog(URL)
+    page = reload()
+    assert page.status_code == 200
+    assert len(page.game_log) == 10
+    assert page.game_log.equals(first.game_log)
+
+
+def test_refresh_appends_only_the_new_games(upstream):
+    upstream['body'] = gamelog_html(10)
+    gamelog.load_gamelog(URL)
+    upstream['body'] = gamelog_html(13)
+    page = reload()
+    assert len(page.game_log) == 13
+    assert page.game_log['PTS'].tolist() == list(range(13))
+    assert len(store.read_gamelog(CURRENT_SEASON, 'testpl01')[1]) == 13
+
+
+def test_failed_refresh_falls_back_to_the_stored_log(upstream):
+    upstream['body'] = gamelog_html(10)
+    first = gamelog.load_gamelog(URL)
+    upstream['status'], upstream['body'] = 429, b''
+    page = reload()
+    assert page.status_code == 200
+    assert page.player_name == first.player_name
+    assert page.game_log.equals(first.game_log)
+
+
+def test_failed_first_load_reports_the_status(upstream):
+    upstream['status'], upstream['body'] = 503, b''
+    page = gamelog.load_gamelog(URL)
+    assert page.status_code == 503 and page.game_log is None
+
+
+def test_newer_than_accepts_only_later_games():
+    accept = gamelog._newer_than(pd.Timestamp('2024-11-01'))
+    assert accept({'date_game': '2024-11-02'})
+    assert not accept({'date_game': '2024-11-01'})
+    assert not accept({'date_game': '2024-10-30'})
+    assert accept({'pts': '12'})  # no date to compare
+
+
+def test_to_seconds_of_no_games_is_empty():
+    seconds = gamelog._to_seconds(pd.Series([], dtype=object))
+    assert seconds.empty and seconds.dtype == 'float32'
+
+
+def test_neutral_site_games_are_neither_home_nor_away(tmp_path):
+    raw = pd.DataFrame({
+        'date_game': ['2024-10-22', '2024-10-24', '2024-10-26'], 'game_location': ['', '@', 'N'],
+        'opp_id': ['BOS', 'MIA', 'LAL'], 'pts': ['10', '20', '30'],
+    }, dtype=object)
+    game_log = gamelog.clean_gamelog(raw)
+    assert game_log['Home'].tolist() == [True, False, pd.NA]
+    index = ThresholdIndex(game_log)
+    assert index.values('PTS', home=True).tolist() == [10]
+    assert index.values('PTS', home=False).tolist() == [20]
+    assert len(index.values('PTS')) == 3
+    # The nullable flags survive the store
+    store.write_gamelog(CURRENT_SEASON, 'testpl01', game_log, root=str(tmp_path))
+    assert store.read_gamelog(CURRENT_SEASON, 'testpl01', root=str(tmp_path))[1]['Home'].equals(game_log['Home'])
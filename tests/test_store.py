@@ -0,0 +1,49 @@
+"""Appending refreshed games to stored gamelogs."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import store
+
+
+def games(dates, opponents):
+    return pd.DataFrame({
+        'PTS': np.arange(len(dates), dtype='float32'),
+        'Opp': pd.Categorical(opponents),
+    }, index=pd.DatetimeIndex(pd.to_datetime(dates), name='Date'))
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path)
+
+
+def test_append_writes_only_games_after_the_last_stored_one(root):
+    stored = games(['2024-10-22', '2024-10-24'], ['BOS', 'MIA'])
+    store.write_gamelog(2025, 'testpl01', stored, 'Test Player', root=root)
+    new = games(['2024-10-24', '2024-10-26', '2024-10-28'], ['MIA', 'LAL', 'BOS'])
+    combined = store.append_games(2025, 'testpl01', stored, new, 'Test Player', root=root)
+    assert combined.index.strftime('%m-%d').tolist() == ['10-22', '10-24', '10-26', '10-28']
+    # Opponents new to the stored log get categories again
+    assert isinstance(combined['Opp'].dtype, pd.CategoricalDtype)
+    assert set(combined['Opp'].cat.categories) == {'BOS', 'LAL', 'MIA'}
+    name, read_back = store.read_gamelog(2025, 'testpl01', root=root)
+    assert name == 'Test Player'
+    assert read_back.index.equals(combined.index)
+
+
+def test_append_with_nothing_new_leaves_the_store_alone(root):
+    stored = games(['2024-10-22'], ['BOS'])
+    store.write_gamelog(2025, 'testpl01', stored, root=root)
+    path = store.partition_path(2025, 'testpl01', root)
+    written = os.stat(path).st_mtime_ns
+    for new in (games([], []), games(['2024-10-22'], ['BOS'])):
+        assert store.append_games(2025, 'testpl01', stored, new, root=root) is stored
+    assert os.stat(path).st_mtime_ns == written
+
+
+def test_last_stored_date_of_an_empty_log_is_none():
+    assert store.last_stored_date(None) is None
+    assert store.last_stored_date(games([], [])) is None
@@ -0,0 +1,107 @@
+"""Extending a TrendState matches building it from the whole gamelog."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trends
+from trends import TrendState
+
+
+def synthetic_gamelog(games=60, seed=0):
+    rng = np.random.default_rng(seed)
+    # Irregular gaps so every rest-day bucket is hit
+    dates = pd.Timestamp('2024-10-22') + pd.to_timedelta(np.cumsum(rng.integers(1, 4, games)), unit='D')
+    game_log = pd.DataFrame({
+        'SEC': rng.integers(600, 2400, games).astype('float64'),
+        'PTS': rng.integers(0, 40, games).astype('float64'),
+        'TRB': rng.integers(0, 15, games).astype('float64'),
+        'AST': rng.integers(0, 12, games).astype('float64'),
+        'Home': rng.random(games) < 0.5,
+        'Opp': rng.choice(['BOS', 'LAL', 'MIA'], games),
+    }, index=pd.DatetimeIndex(dates, name='Date'))
+    # DNPs: no minutes and no stats
+    game_log.iloc[[7, 30], :4] = np.nan
+    return game_log
+
+
+@pytest.mark.parametrize('k', [0, 1, 19, 25, 59])
+def test_extend_matches_full_build(k):
+    game_log = synthetic_gamelog()
+    state = TrendState(game_log[:k])
+    state.extend(game_log)
+    full = TrendState(game_log)
+    pd.testing.assert_frame_equal(state.rolling, full.rolling)
+    pd.testing.assert_frame_equal(state.summary(), full.summary())
+
+
+def test_repeated_extends_match_full_build():
+    game_log = synthetic_gamelog()
+    state = TrendState(game_log[:10])
+    for end in (11, 12, 30, 45, len(game_log)):
+        state.extend(game_log[:end])
+        state.rolling  # compacts the blocks appended so far
+    full = TrendState(game_log)
+    pd.testing.assert_frame_equal(state.rolling, full.rolling)
+    pd.testing.assert_frame_equal(state.summary(), full.summary())
+
+
+def test_extend_rejects_a_gamelog_that_does_not_continue_it():
+    game_log = synthetic_gamelog()
+    state = TrendState(game_log[:20])
+    with pytest.raises(ValueError):
+        state.extend(game_log.drop(game_log.index[3]))
+
+
+def test_cached_state_is_extended_and_resized():
+    game_log = synthetic_gamelog()
+    key = 'test_trends_resized'
+    first = trends.trends(key, game_log[:20])
+    size = trends._states.stats()['bytes']
+    extended = trends.trends(key, game_log)
+    assert extended is first
+    assert extended.games == TrendState(game_log).games
+    assert trends._states.stats()['bytes'] > size
+
+
+def test_neutral_site_games_are_left_out_of_home_and_away_splits():
+    game_log = synthetic_gamelog()
+    game_log['Home'] = pd.array([True, False, None] * 20, dtype='boolean')
+    summary = TrendState(game_log).summary()
+    played = game_log[game_log['SEC'].notna()]
+    assert summary.loc['PTS', 'Home'] == pytest.approx(played.loc[played['Home'] == True, 'PTS'].mean(), abs=0.01)  # noqa: E712
+    assert summary.loc['PTS', 'Away'] == pytest.approx(played.loc[played['Home'] == False, 'PTS'].mean(), abs=0.01)  # noqa: E712
+
+
+def test_states_for_different_players_build_concurrently(monkeypatch):
+    active, overlap, lock = [0], [0], threading.Lock()
+
+    class SlowState(TrendState):
+        def __init__(self, game_log):
+            with lock:
+                active[0] += 1
+                overlap[0] = max(overlap[0], active[0])
+            time.sleep(0.2)
+            super().__init__(game_log)
+            with lock:
+                active[0] -= 1
+    monkeypatch.setattr(trends, 'TrendState', SlowState)
+    game_log = synthetic_gamelog()
+    keys = [f'test_trends_concurrent_{n}' for n in range(4)]
+    with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+        states = list(executor.map(lambda key: trends.trends(key, game_log), keys))
+    assert overlap[0] > 1
+    assert all(isinstance(state, SlowState) for state in states)
+
+
+def test_cached_state_is_rebuilt_for_a_gamelog_it_does_not_continue():
+    game_log = synthetic_gamelog()
+    key = 'test_trends_rebuilt'
+    first = trends.trends(key, game_log[:20])
+    edited = trends.trends(key, game_log.drop(game_log.index[3]))
+    assert edited is not first
+    assert edited.games == TrendState(game_log.drop(game_log.index[3])).games
+    assert trends.trends(key, game_log.drop(game_log.index[3])) is edited
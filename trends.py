@@ -0,0 +1,246 @@
+"""Rolling-window and split analytics for a gamelog.
+
+TrendState computes, for every stat at once, last-5/10/20 rolling means, an
+exponentially weighted mean, home/away and rest-day splits and per-36-minute
+rates. Splits are kept as running sums and counts, so when new games are
+appended to a gamelog the state is extended with just those games instead
+of being recomputed: rolling windows only need the last 20 games, and the
+EWM continues from its last value. States are shared by every session, so
+extending and reading one is serialized by a per-state lock.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from metrics import span
+
+WINDOWS = (5, 10, 20)
+EWM_SPAN = 10
+TRENDS_CACHE_SIZE = 64
+EXCLUDED_STATS = ('G', 'GS', 'SEC')
+REST_BUCKETS = ('B2B', '1 Day', '2+ Days')
+
+_states = LRUCache('trends', max_entries=TRENDS_CACHE_SIZE)
+
+
+def _played_mask(game_log):
+    if 'SEC' in game_log.columns:
+        return game_log['SEC'].notna().to_numpy()
+    return game_log.select_dtypes('number').notna().any(axis=1).to_numpy()
+
+
+def _stat_columns(game_log):
+    numeric = game_log.select_dtypes('number').columns
+    return [col for col in numeric if col not in EXCLUDED_STATS]
+
+
+def played_games(game_log):
+    """(dates, float64 stat block, stat names, home flags) for the games the player appeared in.
+
+    Minutes played are included as the MIN stat. Home flags are 1.0 for home,
+    0.0 for away and NaN for neutral-site games.
+    """
+    mask = _played_mask(game_log)
+    columns = _stat_columns(game_log)
+    names = list(columns)
+    if 'SEC' in game_log.columns:
+        columns = ['SEC'] + columns
+        names = ['MIN'] + names
+    values = game_log[columns].to_numpy(dtype='float64')[mask]
+    if 'SEC' in game_log.columns:
+        values[:, 0] /= 60
+    home = game_log['Home'].to_numpy(dtype='float64', na_value=np.nan)[mask] if 'Home' in game_log.columns else None
+    return game_log.index[mask], values, names, home
+
+
+def _ewm(values, start):
+    """EWM (adjust=False, NaN skipped) of each column of values, continuing from start"""
+    if len(values) > 32:
+        seeded = pd.DataFrame(np.vstack([start, values]))
+        return seeded.ewm(span=EWM_SPAN, adjust=False, ignore_na=True).mean().to_numpy()[1:]
+    # A few appended games: the recursion directly is cheaper than a pandas round-trip
+    alpha = 2 / (EWM_SPAN + 1)
+    out = np.empty_like(values)
+    current = start.copy()
+    for row, value in enumerate(values):
+        fresh = np.isnan(current)
+        current = np.where(np.isnan(value), current, np.where(fresh, value, (1 - alpha) * current + alpha * value))
+        out[row] = current
+    return out
+
+
+def _rest_buckets(dates, previous=None):
+    """Rest-day bucket of each game given the previous game's date"""
+    if not isinstance(dates, pd.DatetimeIndex) or len(dates) == 0:
+        return np.full(len(dates), None, dtype=object)
+    prior = dates[:-1].insert(0, previous if previous is not None else pd.NaT)
+    rest = (dates - prior).days.to_numpy(dtype='float64') - 1
+    return np.select([rest <= 0, rest == 1, rest >= 2], list(REST_BUCKETS), default=None).astype(object)
+
+
+def _rolling_means(context, start, window):
+    """Means over the last window rows (ignoring NaN) for rows start: of context"""
+    valid = ~np.isnan(context)
+    zero = np.zeros((1, context.shape[1]))
+    sums = np.vstack([zero, np.cumsum(np.where(valid, context, 0.0), axis=0)])
+    counts = np.vstack([zero, np.cumsum(valid, axis=0)])
+    rows = np.arange(start, len(context))
+    first = np.maximum(rows - window + 1, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums[rows + 1] - sums[first]) / np.where(counts[rows + 1] - counts[first] > 0,
+                                                          counts[rows + 1] - counts[first], np.nan)
+
+
+class TrendState:
+    """Rolling, EWM and split aggregates for one gamelog, extendable with new games"""
+
+    def __init__(self, game_log):
+        dates, values, self.stats, home = played_games(game_log)
+        self.columns = list(game_log.columns)
+        self._lock = threading.RLock()
+        self.games = 0
+        self.last_date = None
+        width = len(self.stats)
+        self._tail = np.empty((0, width))
+        self._ewm = np.full(width, np.nan)
+        self._sums = {}
+        self._counts = {}
+        self._minutes = np.zeros(width)
+        self._blocks = []
+        self._rolling = None
+        self._extend(dates, values, home)
+
+    def new_games(self, game_log):
+        """Rows of game_log after the games already seen, or None if it does not extend them"""
+        if list(game_log.columns) != self.columns:
+            return None
+        with self._lock:
+            games, last_date = self.games, self.last_date
+        if games == 0:
+            return game_log
+        if not isinstance(game_log.index, pd.DatetimeIndex):
+            return None
+        seen = (game_log.index <= last_date)
+        if _played_mask(game_log)[seen].sum() != games:
+            return None
+        return game_log[~seen]
+
+    def extend(self, game_log):
+        """Fold in the games of game_log past the ones already seen"""
+        with self._lock:
+            new_games = self.new_games(game_log)
+            if new_games is None:
+                raise ValueError("game_log does not extend the games this state has seen")
+            self._append(new_games)
+
+    def _append(self, new_games):
+        if not new_games.empty:
+            dates, values, _, home = played_games(new_games)
+            self._extend(dates, values, home)
+
+    @span("trends.update")
+    def _extend(self, dates, values, home):
+        if len(values) == 0:
+            return
+        with self._lock:
+            self._fold(dates, values, home)
+
+    def _fold(self, dates, values, home):
+        # Rolling windows only look back WINDOWS[-1] games, so the kept tail is enough context
+        context = np.vstack([self._tail, values])
+        blocks = [_rolling_means(context, len(self._tail), window) for window in WINDOWS]
+        # Starting from the last EWM value continues the recursion exactly
+        ewm = _ewm(values, self._ewm)
+        blocks.append(ewm)
+        self._blocks.append((dates, np.hstack(blocks)))
+        self._rolling = None
+
+        # Running sums and counts per split label
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        labels = [np.full(len(values), 'Avg', dtype=object), _rest_buckets(dates, self.last_date)]
+        if home is not None:
+            labels.append(np.select([home == 1, home == 0], ['Home', 'Away'], default=None).astype(object))
+        for label_array in labels:
+            for label in set(label_array) - {None}:
+                mask = label_array == label
+                self._sums[label] = self._sums.get(label, 0.0) + filled[mask].sum(axis=0)
+                self._counts[label] = self._counts.get(label, 0) + valid[mask].sum(axis=0)
+        if 'MIN' in self.stats:
+            minutes = filled[:, self.stats.index('MIN')]
+            self._minutes += (valid * minutes[:, None]).sum(axis=0)
+
+        self._ewm = ewm[-1]
+        self._tail = context[-WINDOWS[-1]:]
+        self.games += len(values)
+        self.last_date = dates[-1]
+
+    @property
+    def rolling(self):
+        """Per-game frame with '<stat> L5', ..., '<stat> EWM' columns"""
+        with self._lock:
+            return self._rolling_frame()
+
+    def _rolling_frame(self):
+        if self._rolling is None:
+            columns = [f'{stat} {name}' for name in [f'L{w}' for w in WINDOWS] + ['EWM'] for stat in self.stats]
+            if self._blocks:
+                index = self._blocks[0][0].append([dates for dates, _ in self._blocks[1:]])
+                data = np.vstack([block for _, block in self._blocks])
+                self._blocks = [(index, data)]
+            else:
+                index, data = pd.Index([]), np.empty((0, len(columns)))
+            self._rolling = pd.DataFrame(data, index=index, columns=columns)
+        return self._rolling
+
+    def summary(self):
+        """One row per stat: overall, rolling, EWM and split averages and the per-36 rate"""
+        with self._lock:
+            return self._summary()
+
+    def _summary(self):
+        table = pd.DataFrame(index=pd.Index(self.stats, name='Stat'))
+        table['Games'] = self._counts.get('Avg', np.zeros(len(self.stats), dtype=int))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table['Avg'] = self._average('Avg')
+            if self._blocks:
+                last = self._blocks[-1][1][-1].reshape(len(WINDOWS) + 1, len(self.stats))
+                for row, name in enumerate([f'L{w}' for w in WINDOWS] + ['EWM']):
+                    table[name] = last[row]
+            for label in ('Home', 'Away') + REST_BUCKETS:
+                table[label] = self._average(label)
+            per_36 = self._sums.get('Avg', np.zeros(len(self.stats))) / np.where(self._minutes > 0, self._minutes, np.nan) * 36
+        # Minutes and shooting percentages have no meaningful per-minute rate
+        table['Per 36'] = np.where([s == 'MIN' or s.endswith('%') for s in self.stats], np.nan, per_36)
+        return table.round(2)
+
+    def _average(self, label):
+        if label not in self._sums:
+            return np.full(len(self.stats), np.nan)
+        counts = self._counts[label]
+        return self._sums[label] / np.where(counts > 0, counts, np.nan)
+
+
+def trends(key, game_log):
+    """Return the TrendState for game_log, extending the cached one when games were appended.
+
+    States for different keys are built concurrently; callers asking for the
+    same missing key share one build, and appends take only that state's lock.
+    """
+    state = _states.get(key)
+    if state is None:
+        return _states.get_or_build(key, lambda: TrendState(game_log))
+    games = state.games
+    try:
+        state.extend(game_log)
+    except ValueError:
+        # Not a continuation of the cached games (e.g. an edited log): start over
+        state = TrendState(game_log)
+        _states.put(key, state)
+        return state
+    if state.games != games:
+        # Store it again so the cache's memory accounting sees the added games
+        _states.put(key, state)
+    return state